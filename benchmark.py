@@ -41,20 +41,21 @@ from datetime import datetime
 from logging import getLogger, INFO
 from os import getenv
 from pathlib import Path
-from typing import Any, Type, List
+from typing import Any, Optional, Type, List
 
 from dotenv import load_dotenv
 
 from config import AUDIO_SAMPLE_RATE, CHUNK_MS, TEST_REALTIME_FACTOR, FINAL_SILENCE_S, OUT_PATH, ASSETS_DIR
 from helpers.diff_report import DiffReport
 from helpers.load_assets import get_test_files, AssetPair
+from helpers.stream_wav import WavPcmCache
 from helpers.transcribe import transcribe_and_diff
 from lib.stt_provider_cartesia import CartesiaInkProvider, CartesiaSttConfig
 from lib.stt_provider_deepgram import DeepgramRealtimeProvider, DeepgramSttConfig
 from lib.stt_provider_elevenlabs import ElevenLabsRealtimeProvider, ElevenLabsSttConfig
 from lib.stt_provider_google import GoogleRealtimeProvider, GoogleSttConfig
 from lib.stt_provider_speechmatics import SpeechmaticsRealtimeProvider, SpeechmaticsSttConfig
-from lib.utils import setup_logging
+from lib.utils import setup_logging, run_async
 
 setup_logging(INFO)
 logger = getLogger(__name__)
@@ -127,7 +128,8 @@ def build_provider_specs() -> list[ProviderSpec]:
 # Per-provider runner (processes all files sequentially)
 # ---------------------------------------------------------------------------
 
-async def run_provider(spec: ProviderSpec, pairs: list[AssetPair], ts: str, custom_metric_fn=None) -> list[BenchmarkResult]:
+async def run_provider(spec: ProviderSpec, pairs: list[AssetPair], ts: str, custom_metric_fn=None,
+                       pcm_cache: Optional[WavPcmCache] = None) -> list[BenchmarkResult]:
     """Run one provider against all asset files. Returns one result per file."""
     results: list[BenchmarkResult] = []
 
@@ -146,6 +148,7 @@ async def run_provider(spec: ProviderSpec, pairs: list[AssetPair], ts: str, cust
                 realtime_factor=TEST_REALTIME_FACTOR,
                 silence_s=FINAL_SILENCE_S,
                 custom_metric_fn=custom_metric_fn,
+                pcm_cache=pcm_cache,
             )
             logger.info("[%s] %s — WER: %.1f%%, CER: %.1f%%", spec.name, pair.wav.name, report.word_error_rate, report.character_error_rate)
             results.append(BenchmarkResult(spec.name, pair.wav.name, report, report_path, None))
@@ -219,8 +222,9 @@ async def main() -> None:
 
     logger.info("Benchmark starting: %d provider(s), %d file(s).", len(specs), len(pairs))
 
-    # Run all providers in parallel
-    nested: list[list[BenchmarkResult]] = await asyncio.gather( *(run_provider(spec, pairs, ts, custom_metric_fn=semantic_understanding_fn) for spec in specs),)  # type: ignore[assignment] — asyncio.gather returns tuple, but runtime values match
+    # Run all providers in parallel; each asset is decoded once and shared by all of them.
+    pcm_cache = WavPcmCache()
+    nested: list[list[BenchmarkResult]] = await asyncio.gather( *(run_provider(spec, pairs, ts, custom_metric_fn=semantic_understanding_fn, pcm_cache=pcm_cache) for spec in specs),)  # type: ignore[assignment] — asyncio.gather returns tuple, but runtime values match
     all_results: List[BenchmarkResult] = [r for provider_results in nested for r in provider_results]
 
     # Write TSV
@@ -247,4 +251,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_async(main())
\ No newline at end of file
@@ -3,16 +3,20 @@ from __future__ import annotations
 import asyncio
 import wave
 from dataclasses import dataclass
+from functools import lru_cache
 from logging import getLogger
 from pathlib import Path
 from typing import Iterator, Optional
 
+from lib.stt_provider import PcmChunk
+
 logger = getLogger(__name__)
 
 
+@lru_cache(maxsize=16)
 def make_silence_chunk(duration_s: float, sample_rate: int, sample_width_bytes: int) -> bytes:
-    """Create a silence audio chunk of given duration."""
-    return b"\x00" * sample_width_bytes * int(sample_rate * duration_s)
+    """Create a silence audio chunk of given duration (cached: the result is immutable bytes)."""
+    return bytes(sample_width_bytes * int(sample_rate * duration_s))  # zero-filled in one allocation
 
 
 class QueueFullError(Exception):
@@ -20,8 +24,15 @@ class QueueFullError(Exception):
     pass
 
 
-async def _put_with_timeout(queue: asyncio.Queue, item: bytes | None, timeout: float = 5.0) -> None:
+async def _put_with_timeout(queue: asyncio.Queue, item: PcmChunk | None, timeout: float = 5.0) -> None:
     """Put item to queue with timeout. Raises QueueFullError if queue stays full."""
+    # Fast path: the consumer normally keeps up, so there is room and no timer/future
+    # needs to be set up. Only a full queue pays for wait_for().
+    try:
+        queue.put_nowait(item)
+        return
+    except asyncio.QueueFull:
+        pass
     try:
         await asyncio.wait_for(queue.put(item), timeout=timeout)
     except asyncio.TimeoutError:
@@ -33,17 +44,19 @@ async def _put_with_timeout(queue: asyncio.Queue, item: bytes | None, timeout: f
 
 async def stream_silence(duration_s: float, audio_queue: asyncio.Queue, chunk_ms: int, *,
                          realtime_factor: float = 1.0, sample_rate: int = 16000, sample_width_bytes: int = 2) -> int:
-    logger.debug(f"[WAV]: streaming silence chunks for {duration_s:.1f} seconds.")
+    logger.debug("[WAV]: streaming silence chunks for %.1f seconds.", duration_s)
     if duration_s <= 0.0:
         return 0
 
     total_s = 0.0
     chunk_s = chunk_ms / 1000.0
+    sleep_s = chunk_s * realtime_factor
+    # bytes are immutable, so the same zero-filled chunk can be queued every time.
+    chunk = make_silence_chunk(chunk_s, sample_rate, sample_width_bytes)
     chunks = 0
     while total_s < duration_s:
-        chunk = make_silence_chunk(chunk_s, sample_rate, sample_width_bytes)
         await _put_with_timeout(audio_queue, chunk)
-        await asyncio.sleep(chunk_s * realtime_factor)
+        await asyncio.sleep(sleep_s)
         total_s += chunk_s
         chunks += 1
 
@@ -82,35 +95,87 @@ def inspect_wav(path: Path) -> WavFormat:
     logger.debug("[WAV] analyzing file: %s", str(path))
     path = path.resolve()
     with wave.open(str(path), "rb") as wf:
-        return WavFormat(channels=wf.getnchannels(), sample_width_bytes=wf.getsampwidth(),
-                         sample_rate=wf.getframerate(), n_frames=wf.getnframes(), comptype=wf.getcomptype(),
-                         compname=wf.getcompname(), )
+        return _wav_format(wf)
 
 
-def iter_wav_pcm_chunks(path: Path, *, chunk_ms: int, expected_sample_rate: int, expected_channels: int = 1,
-                        expected_sample_width_bytes: int = 2, ) -> Iterator[bytes]:
+def _wav_format(wf: wave.Wave_read) -> WavFormat:
+    """Read the format metadata of an already opened WAV file."""
+    return WavFormat(channels=wf.getnchannels(), sample_width_bytes=wf.getsampwidth(),
+                     sample_rate=wf.getframerate(), n_frames=wf.getnframes(), comptype=wf.getcomptype(),
+                     compname=wf.getcompname(), )
+
+
+def load_wav_pcm(path: Path, *, expected_sample_rate: int, expected_channels: int = 1,
+                 expected_sample_width_bytes: int = 2, ) -> bytes:
     """
-    Returns iterator: Yield raw PCM frames from a WAV file in fixed chunk sizes.
+    Validate a WAV file and return its raw PCM data (exactly what wave.readframes returns).
 
     Assumptions/enforced:
       - uncompressed PCM WAV (comptype == 'NONE')
       - expected sample rate / channels / sample width
-      - output bytes are exactly what wave.readframes returns (interleaved if channels>1)
+    """
+    # One open for both the header check and the data (inspect_wav() would open it again).
+    with wave.open(str(path), "rb") as wf:
+        fmt = _wav_format(wf)
+        logger.debug("[WAV] file: %s; format: %r", str(path), fmt)
+
+        if fmt.comptype != "NONE":
+            raise ValueError(
+                f"{path.name}: compressed WAV not supported (comptype={fmt.comptype} {fmt.compname})")
+        if fmt.sample_rate != expected_sample_rate:
+            raise ValueError(f"{path.name}: sample_rate={fmt.sample_rate} expected={expected_sample_rate}")
+        if fmt.channels != expected_channels:
+            raise ValueError(f"{path.name}: channels={fmt.channels} expected={expected_channels}")
+        if fmt.sample_width_bytes != expected_sample_width_bytes:
+            raise ValueError(
+                f"{path.name}: sample_width_bytes={fmt.sample_width_bytes} expected={expected_sample_width_bytes}")
+
+        return wf.readframes(fmt.n_frames)
+
+
+class WavPcmCache:
+    """
+    Decoded PCM of WAV files, keyed by (path, expected format), owned by the caller.
+
+    For callers that stream the same files repeatedly (the tests and the benchmark run
+    every asset through every provider): each file is decoded once for the lifetime of
+    the cache instead of once per stream. Entries are never evicted or invalidated, so
+    only use it for a known, bounded set of files.
+    """
+
+    def __init__(self) -> None:
+        self._pcm: dict[tuple[Path, int, int, int], bytes] = {}
+
+    def load(self, path: Path, *, expected_sample_rate: int, expected_channels: int = 1,
+             expected_sample_width_bytes: int = 2, ) -> bytes:
+        """Same as load_wav_pcm(), but returns the cached PCM on repeated calls."""
+        key = (path.resolve(), expected_sample_rate, expected_channels, expected_sample_width_bytes)
+        pcm = self._pcm.get(key)
+        if pcm is None:
+            pcm = self._pcm[key] = load_wav_pcm(path, expected_sample_rate=expected_sample_rate,
+                                                expected_channels=expected_channels,
+                                                expected_sample_width_bytes=expected_sample_width_bytes, )
+        return pcm
+
+
+def iter_wav_pcm_chunks(path: Path, *, chunk_ms: int, expected_sample_rate: int, expected_channels: int = 1,
+                        expected_sample_width_bytes: int = 2,
+                        pcm_cache: Optional[WavPcmCache] = None, ) -> Iterator[memoryview]:
+    """
+    Returns iterator: Yield raw PCM frames from a WAV file in fixed chunk sizes.
+
+    The file is validated and decoded by load_wav_pcm() (see there for the enforced
+    format; output is interleaved if channels>1), or taken from pcm_cache if given.
+    The chunks are zero-copy memoryview slices of its PCM data instead of one
+    readframes() copy per chunk; providers accept them as PcmChunk (see
+    lib/stt_provider.py).
 
     If you want to support more formats later, extend here (not in tests).
     """
-    fmt = inspect_wav(path)
-    logger.debug("[WAV] file: %s; format: %r", str(path), fmt)
-
-    if fmt.comptype != "NONE":
-        raise ValueError(f"{path.name}: compressed WAV not supported (comptype={fmt.comptype} {fmt.compname})")
-    if fmt.sample_rate != expected_sample_rate:
-        raise ValueError(f"{path.name}: sample_rate={fmt.sample_rate} expected={expected_sample_rate}")
-    if fmt.channels != expected_channels:
-        raise ValueError(f"{path.name}: channels={fmt.channels} expected={expected_channels}")
-    if fmt.sample_width_bytes != expected_sample_width_bytes:
-        raise ValueError(
-            f"{path.name}: sample_width_bytes={fmt.sample_width_bytes} expected={expected_sample_width_bytes}")
+    load = pcm_cache.load if pcm_cache is not None else load_wav_pcm
+    pcm = memoryview(load(path, expected_sample_rate=expected_sample_rate,
+                          expected_channels=expected_channels,
+                          expected_sample_width_bytes=expected_sample_width_bytes, ))
 
     frames_per_chunk = int(expected_sample_rate * (chunk_ms / 1000.0))
     logger.debug("[WAV] frames_per_chunk: %.0f (sample rate %d; chunk_ms %.0f)", frames_per_chunk, expected_sample_rate,
@@ -118,17 +183,14 @@ def iter_wav_pcm_chunks(path: Path, *, chunk_ms: int, expected_sample_rate: int,
     if frames_per_chunk <= 0:
         raise ValueError("chunk_ms too small")
 
-    with wave.open(str(path), "rb") as wf:
-        logger.info("Starting streaming...")
-        while True:
-            data = wf.readframes(frames_per_chunk)
-            if not data:
-                break
-            yield data
+    bytes_per_chunk = frames_per_chunk * expected_channels * expected_sample_width_bytes
+    logger.info("Starting streaming...")
+    for offset in range(0, len(pcm), bytes_per_chunk):
+        yield pcm[offset:offset + bytes_per_chunk]
 
 
-async def stream_pcm_to_queue_realtime(pcm_chunks: Iterator[bytes], audio_queue: asyncio.Queue, chunk_ms: int, *,
-                                       realtime_factor: float = 1.0, silence_s: float = 2.0,
+async def stream_pcm_to_queue_realtime(pcm_chunks: Iterator[PcmChunk], audio_queue: asyncio.Queue,
+                                       chunk_ms: int, *, realtime_factor: float = 1.0, silence_s: float = 2.0,
                                        expected_sample_rate: int = 16000, expected_sample_width_bytes: int = 2,
                                        running: Optional[asyncio.Event] = None) -> int:
     """
@@ -139,7 +201,7 @@ async def stream_pcm_to_queue_realtime(pcm_chunks: Iterator[bytes], audio_queue:
     None as a sentinel when streaming completes.
 
     Args:
-        pcm_chunks: Iterator yielding raw PCM audio data as bytes.
+        pcm_chunks: Iterator yielding raw PCM audio data (bytes or memoryview slices).
         audio_queue: Async queue to receive audio chunks. A None sentinel is
             pushed when streaming completes.
         chunk_ms: Duration of each chunk in milliseconds, used for pacing timing.
@@ -171,7 +233,7 @@ async def stream_pcm_to_queue_realtime(pcm_chunks: Iterator[bytes], audio_queue:
         cnt += 1
 
         if cnt % 20 == 0:
-            logger.debug(f"[WAV]: sent chunk {cnt}.")
+            logger.debug("[WAV]: sent chunk %d.", cnt)
 
         if realtime_factor > 0:
             await asyncio.sleep((chunk_ms / 1000.0) * realtime_factor)
@@ -184,7 +246,7 @@ async def stream_pcm_to_queue_realtime(pcm_chunks: Iterator[bytes], audio_queue:
                                                   sample_width_bytes=expected_sample_width_bytes)
 
     # cleanly close - this is important
-    logger.info(f"Wav streaming: done, sent {cnt} chunks. Pushing None to the audio queue.")
+    logger.info("Wav streaming: done, sent %d chunks. Pushing None to the audio queue.", cnt)
     await _put_with_timeout(audio_queue, None)
 
     # done
@@ -193,7 +255,8 @@ async def stream_pcm_to_queue_realtime(pcm_chunks: Iterator[bytes], audio_queue:
 
 async def stream_wav_file(file: Path, audio_queue: asyncio.Queue, chunk_ms: int, expected_sample_rate: int, *,
                           realtime_factor: float = 1.0, silence: float = 2.0, expected_channels: int = 1,
-                          expected_sample_width_bytes: int = 2, running: Optional[asyncio.Event] = None):
+                          expected_sample_width_bytes: int = 2, running: Optional[asyncio.Event] = None,
+                          pcm_cache: Optional[WavPcmCache] = None):
     """
     Stream a WAV file to an async queue with real-time pacing, suitable for STT providers.
 
@@ -217,6 +280,8 @@ async def stream_wav_file(file: Path, audio_queue: asyncio.Queue, chunk_ms: int,
             Raises if mismatch.
         running: Optional asyncio.Event for runtime cancellation. If set and cleared, streaming
             stops early.
+        pcm_cache: Optional WavPcmCache to reuse the decoded file across calls. Without it
+            the file is read from disk on every call.
 
     Returns:
         Total number of chunks streamed (including silence chunks).
@@ -238,7 +303,8 @@ async def stream_wav_file(file: Path, audio_queue: asyncio.Queue, chunk_ms: int,
 
     pcm_chunks_iterator = iter_wav_pcm_chunks(file, chunk_ms=chunk_ms, expected_sample_rate=expected_sample_rate,
                                               expected_channels=expected_channels,
-                                              expected_sample_width_bytes=expected_sample_width_bytes, )
+                                              expected_sample_width_bytes=expected_sample_width_bytes,
+                                              pcm_cache=pcm_cache, )
 
     # This actually streams chunks to the queue and blocks until it is done.
     return await stream_pcm_to_queue_realtime(pcm_chunks_iterator, audio_queue, chunk_ms=chunk_ms,
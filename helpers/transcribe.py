@@ -5,8 +5,9 @@ from pathlib import Path
 from typing import Awaitable, Callable, Optional
 
 from helpers.diff_report import CustomMetricResult, DiffReport
-from helpers.stream_wav import stream_wav_file, QueueFullError, logger
+from helpers.stream_wav import stream_wav_file, QueueFullError, WavPcmCache, logger
 from helpers.transcript_ingest import transcript_ingest_task
+from lib.spsc_queue import AsyncSpscQueue
 from lib.stt import stt_session_task
 from lib.stt_provider import RealtimeSttProvider
 
@@ -19,6 +20,7 @@ async def transcribe_wav_realtime(
         sample_rate: int = 16_000,
         realtime_factor: float = 1.0,
         silence_s: float = 2.0,
+        pcm_cache: Optional[WavPcmCache] = None,
 ) -> str:
     """
     Transcribe a WAV file using the given STT provider.
@@ -59,6 +61,7 @@ async def transcribe_wav_realtime(
         sample_rate: Expected sample rate in Hz.
         realtime_factor: Playback speed (1.0 = real-time, 0.0 = no delay).
         silence_s: Silence padding (seconds) added before and after audio for VAD.
+        pcm_cache: Optional WavPcmCache, for callers that transcribe the same files repeatedly.
 
     Returns:
         The full transcript as a single string (segments joined by space).
@@ -69,7 +72,7 @@ async def transcribe_wav_realtime(
         it is a symptom of an STT failure.
     """
     input_audio_queue: asyncio.Queue = asyncio.Queue(maxsize=40)
-    output_transcript_queue: asyncio.Queue = asyncio.Queue(maxsize=200)
+    output_transcript_queue: AsyncSpscQueue = AsyncSpscQueue()
     running = asyncio.Event()
     running.set()
 
@@ -91,6 +94,7 @@ async def transcribe_wav_realtime(
             realtime_factor=realtime_factor,
             silence=silence_s,
             running=running,
+            pcm_cache=pcm_cache,
         )
     except QueueFullError:
         pass  # STT exited early and cancelled its sender; queue backed up. Real error is in stt_task.
@@ -122,6 +126,7 @@ async def transcribe_and_diff(
         realtime_factor: float = 1.0,
         silence_s: float = 2.0,
         custom_metric_fn: Optional[Callable[[str, str], Awaitable[CustomMetricResult]]] = None,
+        pcm_cache: Optional[WavPcmCache] = None,
 ) -> DiffReport:
     """
     Transcribe a WAV file and compare against ground-truth text.
@@ -142,6 +147,7 @@ async def transcribe_and_diff(
         custom_metric_fn: Optional async callable (expected, got) -> CustomMetricResult.
             When supplied, the result is embedded in the DiffReport and shown in the
             HTML report and TSV export. See helpers/semantic_understanding.py for an example.
+        pcm_cache: Optional WavPcmCache, for callers that transcribe the same files repeatedly.
 
     Returns:
         DiffReport with accuracy metrics and paths.
@@ -155,6 +161,7 @@ async def transcribe_and_diff(
         sample_rate=sample_rate,
         realtime_factor=realtime_factor,
         silence_s=silence_s,
+        pcm_cache=pcm_cache,
     )
     logger.info("Final transcript raw: %r", transcript_raw)
 
@@ -2,13 +2,14 @@
 Transcript Ingest — consuming committed transcripts from the STT pipeline.
 
 The STT session (lib/stt.py) pushes committed transcript strings into an
-asyncio.Queue and signals completion with a None sentinel. This module
-provides a ready-made consumer that collects those strings into a list.
+AsyncSpscQueue (lib/spsc_queue.py) and signals completion with a None
+sentinel. This module provides a ready-made consumer that collects those
+strings into a list.
 
 Use it as a reference for building your own real-time consumer. The queue
 contract is simple:
 
-    str   → a committed transcript segment (one or more words)
+    str   → a committed transcript segment (one or more words, already stripped)
     None  → end-of-stream, no more segments will arrive
 
 A minimal custom consumer might look like::
@@ -30,19 +31,23 @@ from logging import getLogger
 
 from typing import Optional, List
 
+from lib.spsc_queue import AsyncSpscQueue
+
 logger = getLogger(__name__)
 
 
 async def transcript_ingest_task(
         app_running: asyncio.Event,
-        transcript_queue: asyncio.Queue[Optional[str]],
+        transcript_queue: AsyncSpscQueue[Optional[str]],
 ) -> List[str]:
     """
     Collect committed transcript segments from the queue until end-of-stream.
 
-    Reads items one at a time. Each non-None item is a committed transcript
-    segment produced by the STT receiver. A None item signals that the
-    provider has closed and no more segments will arrive.
+    Drains all queued items per wakeup with AsyncSpscQueue.get_batch(), so
+    the queue must be an AsyncSpscQueue (asyncio.Queue has no get_batch()).
+    Each non-None item is a committed transcript segment produced by the
+    STT receiver. A None item signals that the provider has closed and no
+    more segments will arrive.
 
     Args:
         app_running: Event flag; consumption continues while set. Clear it
@@ -55,15 +60,15 @@ async def transcript_ingest_task(
     """
     result: List[str] = []
     try:
-        while app_running.is_set():
-            item = await transcript_queue.get()
-            if item is None:
-                logger.info("[INGEST] Received stop signal.")
-                break
-            text = item.strip()
-            if text:
-                logger.debug("[INGEST] Received: %s", text[:100])
-                result.append(text)
+        is_running = app_running.is_set
+        while is_running():
+            for item in await transcript_queue.get_batch():
+                if item is None:
+                    logger.info("[INGEST] Received stop signal.")
+                    return result
+                # _stt_receiver only queues stripped, non-empty segments.
+                logger.debug("[INGEST] Received: %.100s", item)
+                result.append(item)
     except asyncio.CancelledError:
         logger.info("Cancelled.")
         raise
@@ -0,0 +1,128 @@
+"""
+Single-producer / single-consumer async queue.
+
+A lighter alternative to asyncio.Queue for the pipeline's one-to-one
+hand-offs, e.g. STT receiver → transcript consumer:
+
+    _stt_receiver  --put()-->  AsyncSpscQueue  --get()-->  transcript_ingest_task
+
+Items live in a collections.deque. When the consumer finds it empty it parks
+on a single future, which the next put resolves. There are no putter/getter
+waiter lists and no per-item futures: get() only creates a future when it
+actually has to wait.
+
+The queue is unbounded by default, so put() never blocks. With maxsize > 0
+it applies backpressure like asyncio.Queue: put() parks the producer on a
+single future while the queue is full, which the next get resolves, and
+put_nowait() raises asyncio.QueueFull.
+
+The interface mirrors the subset of asyncio.Queue used in this project
+(put, put_nowait, get, get_nowait, qsize, empty, full), so it is a drop-in
+replacement. get_batch() additionally drains everything that is queued in
+one call, for consumers that can process several items at once (it has no
+asyncio.Queue counterpart). None is passed through like any other item —
+callers use it as the end-of-stream sentinel.
+
+Only one coroutine may wait in get() and one in put() at a time.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncSpscQueue(Generic[T]):
+    """FIFO queue for exactly one producer and one consumer; unbounded unless maxsize > 0."""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._items: deque[T] = deque()
+        self._maxsize = maxsize
+        self._waiter: Optional[asyncio.Future[None]] = None  # set while the consumer waits
+        self._putter: Optional[asyncio.Future[None]] = None  # set while the producer waits (bounded only)
+
+    def qsize(self) -> int:
+        """Number of items in the queue."""
+        return len(self._items)
+
+    def empty(self) -> bool:
+        """True if the queue holds no items."""
+        return not self._items
+
+    def full(self) -> bool:
+        """True if the queue is bounded and holds maxsize items."""
+        return 0 < self._maxsize <= len(self._items)
+
+    def put_nowait(self, item: T) -> None:
+        """Append an item and wake the consumer. Raises asyncio.QueueFull if a bounded queue is full."""
+        if self._maxsize and len(self._items) >= self._maxsize:
+            raise asyncio.QueueFull
+        self._items.append(item)
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():  # the getter may have been cancelled
+                waiter.set_result(None)
+
+    async def put(self, item: T) -> None:
+        """Append an item, waiting while a bounded queue is full (never waits when unbounded)."""
+        while self.full():
+            await self._wait_not_full()
+        self.put_nowait(item)
+
+    def get_nowait(self) -> T:
+        """Remove and return the oldest item. Raises asyncio.QueueEmpty if there is none."""
+        if not self._items:
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        if self._putter is not None:
+            self._wake_putter()
+        return item
+
+    async def get(self) -> T:
+        """Remove and return the oldest item, waiting for one if the queue is empty."""
+        while not self._items:
+            await self._wait_not_empty()
+        item = self._items.popleft()
+        if self._putter is not None:
+            self._wake_putter()
+        return item
+
+    async def get_batch(self) -> list[T]:
+        """Remove and return all queued items (at least one), waiting if the queue is empty."""
+        while not self._items:
+            await self._wait_not_empty()
+        items = list(self._items)
+        self._items.clear()
+        if self._putter is not None:
+            self._wake_putter()
+        return items
+
+    async def _wait_not_empty(self) -> None:
+        """Park the consumer on a fresh future until the next put."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiter = waiter
+        try:
+            await waiter
+        finally:
+            if self._waiter is waiter:  # cancelled before a put resolved it
+                self._waiter = None
+
+    async def _wait_not_full(self) -> None:
+        """Park the producer on a fresh future until the next get."""
+        putter = asyncio.get_running_loop().create_future()
+        self._putter = putter
+        try:
+            await putter
+        finally:
+            if self._putter is putter:  # cancelled before a get resolved it
+                self._putter = None
+
+    def _wake_putter(self) -> None:
+        """Resolve the producer's future after a get made room."""
+        putter = self._putter
+        self._putter = None
+        if not putter.done():  # the putter may have been cancelled
+            putter.set_result(None)
@@ -5,18 +5,22 @@ This module runs a single real-time STT session against any provider that
 implements the RealtimeSttProvider protocol (see lib/stt_provider.py).
 Communication is fully queue-based:
 
-    audio_queue  (bytes | None)  →  provider  →  transcript_queue  (str | None)
+    audio_queue  (PcmChunk | None)  →  provider  →  transcript_queue  (str | None)
 
 Internally two concurrent tasks handle the plumbing:
 
-  _sender   — pulls PCM chunks from audio_queue, forwards them to the
-              provider via send_audio(). A None chunk signals end-of-audio
-              and triggers provider.end_audio().
+  _stt_sender   — pulls PCM chunks from audio_queue, forwards them to the
+                  provider via send_audio(). A None chunk signals end-of-audio
+                  and triggers provider.end_audio(). The sender blocks on the
+                  queue only — it does not poll conversation_running; an early
+                  stop wakes it with the same None (see stop_stt_session()).
+                  Optionally (max_batch_bytes) chunks that have piled up in the
+                  queue are merged into one send.
 
-  _receiver — iterates the provider's event stream. Committed (is_final)
-              transcript segments are pushed into transcript_queue. When the
-              provider closes the stream cleanly, a None sentinel is pushed
-              to signal end-of-transcripts.
+  _stt_receiver — iterates the provider's event stream. Committed (is_final)
+                  transcript segments are pushed into transcript_queue. When the
+                  provider closes the stream cleanly, a None sentinel is pushed
+                  to signal end-of-transcripts.
 
 Close handling
 --------------
@@ -32,8 +36,9 @@ Normal close (all audio sent, provider finishes):
 Early close (provider drops the connection unexpectedly):
   1. Receiver detects the closed connection and raises the provider's error.
      It does NOT put None in transcript_queue — the queue stays open.
-  2. stt_session_task's finally cancels the sender immediately, stopping
-     further no-op send_audio() calls on the dead connection.
+  2. The receiver's exit cancels the sender immediately, stopping
+     further no-op send_audio() calls on the dead connection. Both tasks
+     run in an asyncio.TaskGroup, so neither outlives the session.
   3. stt_session_task exits with the provider's exception.
 
 Respawn design
@@ -50,38 +55,149 @@ transcript_queue:
     seamlessly receive transcripts from the new session.
 
 This makes session respawn transparent to both the audio producer and the
-transcript consumer — only the session layer needs to be restarted.
+transcript consumer — only the session layer needs to be restarted. The one
+exception is a failure after the sender has already taken the None sentinel
+(e.g. while the provider flushes its final transcripts): the producer is done,
+so a new session would wait for audio forever. The session reports this via
+its audio_ended event and no respawn is attempted.
+stt_session_with_respawn() implements exactly this loop, waiting between
+attempts with exponential backoff and jitter so that many clients hit by the
+same network flap do not reconnect to the provider in lockstep.
 
 Typical usage::
 
     provider = SomeProvider(config)
-    audio_q:      asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=40)
-    transcript_q: asyncio.Queue[str   | None] = asyncio.Queue(maxsize=200)
+    audio_q:      asyncio.Queue[PcmChunk | None] = asyncio.Queue(maxsize=40)
+    transcript_q: AsyncSpscQueue[str | None] = AsyncSpscQueue()
     running = asyncio.Event()
     running.set()
 
     task = asyncio.create_task(stt_session_task(provider, audio_q, transcript_q, running))
 
     # Feed audio into audio_q (e.g. from a microphone or WAV file),
-    # then push None to signal end-of-audio.
+    # then push None to signal end-of-audio. To stop early instead, call
+    # stop_stt_session(running, audio_q).
     # Read committed transcripts from transcript_q until you receive None.
 
     await task
 """
 import asyncio
 from logging import getLogger
-from typing import Optional
+from random import random
+from time import monotonic
+from typing import Callable, Optional
 
-from lib.stt_provider import RealtimeSttProvider
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt_provider import PcmChunk, RealtimeSttProvider
 
 logger = getLogger(__name__)
 
+STT_RESPAWN_MAX_RETRIES = 5
+STT_RESPAWN_RETRY_DELAY_S = 1.0
+STT_RESPAWN_MAX_DELAY_S = 30.0
+# A session that ran at least this long counts as healthy: its failure resets the backoff.
+STT_RESPAWN_HEALTHY_SESSION_S = 60.0
+
+
+def _coalesce_audio(
+        chunk: PcmChunk,
+        audio_queue: asyncio.Queue[Optional[PcmChunk]],
+        max_batch_bytes: int,
+) -> tuple[PcmChunk, bool]:
+    """
+    Append chunks that are already waiting in audio_queue to *chunk*, up to max_batch_bytes.
+
+    Never waits, so no latency is added: when the sender keeps up there is nothing
+    to coalesce. Returns the (possibly merged) chunk and True if the None sentinel
+    was consumed along the way.
+    """
+    if len(chunk) >= max_batch_bytes or audio_queue.empty():
+        return chunk, False
+    buf = bytearray(chunk)
+    while len(buf) < max_batch_bytes and not audio_queue.empty():
+        nxt = audio_queue.get_nowait()
+        if nxt is None:
+            return bytes(buf), True
+        buf += nxt
+    return bytes(buf), False
+
+
+def stop_stt_session(conversation_running: asyncio.Event,
+                     audio_queue: asyncio.Queue[Optional[PcmChunk]]) -> None:
+    """
+    Request an early stop: clear conversation_running and wake the sender with None.
+
+    The sender only waits on audio_queue, so the None sentinel is what stops it,
+    even while it is blocked on an empty queue. If the queue is full the oldest
+    chunk is dropped to make room — the conversation is ending anyway.
+    """
+    conversation_running.clear()
+    try:
+        audio_queue.put_nowait(None)
+    except asyncio.QueueFull:
+        audio_queue.get_nowait()
+        audio_queue.put_nowait(None)
+
+
+async def _stt_sender(
+        provider: RealtimeSttProvider,
+        audio_queue: asyncio.Queue[Optional[PcmChunk]],
+        max_batch_bytes: int = 0,
+        audio_ended: Optional[asyncio.Event] = None,
+) -> None:
+    """Forward PCM chunks from audio_queue to the provider until None, then end the audio stream."""
+    try:
+        end_of_audio = False
+        while not end_of_audio:
+            chunk = await audio_queue.get()
+            if chunk is None:
+                end_of_audio = True
+                break
+            if max_batch_bytes:
+                chunk, end_of_audio = _coalesce_audio(chunk, audio_queue, max_batch_bytes)
+            await provider.send_audio(chunk)
+    except Exception as e:
+        # Not fatal for the session: the receiver decides how it ends (the provider
+        # reports its own error through events()).
+        logger.warning("[STT] _stt_sender() failed: %r", e)
+    finally:
+        logger.debug("[STT] _stt_sender() reached finally.")
+        if end_of_audio and audio_ended is not None:
+            audio_ended.set()  # the sentinel is gone from audio_queue
+        await provider.end_audio()
+
+
+async def _stt_receiver(
+        provider: RealtimeSttProvider,
+        transcript_queue: AsyncSpscQueue[Optional[str]],
+        conversation_running: asyncio.Event,
+) -> None:
+    """Push committed transcripts from the provider's event stream into transcript_queue, then None."""
+    is_running = conversation_running.is_set  # bound once; checked on every event
+    async for ev in provider.events():
+        logger.debug("[STT] _stt_receiver(): received event: %r", ev)
+        if not is_running():
+            logger.warning("[STT] _stt_receiver(): conversation_running is not set, breaking")
+            break
+        if not ev.is_final:
+            continue
+        text = ev.text.strip()
+        if text:
+            logger.debug("[STT] _stt_receiver(): putting in transcript_queue: %.50s", text)
+            await transcript_queue.put(text)
+            logger.debug("[STT] _stt_receiver(): put completed, queue size now: %d", transcript_queue.qsize())
+
+    logger.debug("[STT] _stt_receiver() reached finally. Putting stop token to the transcript_queue.")
+    await transcript_queue.put(None)
+
 
 async def stt_session_task(
         provider: RealtimeSttProvider,
-        audio_queue: asyncio.Queue[Optional[bytes]],
-        transcript_queue: asyncio.Queue[Optional[str]],
+        audio_queue: asyncio.Queue[Optional[PcmChunk]],
+        transcript_queue: AsyncSpscQueue[Optional[str]],
         conversation_running: asyncio.Event,
+        max_batch_bytes: int = 0,
+        audio_ended: Optional[asyncio.Event] = None,
 ) -> None:
     """
     Run a provider-agnostic real-time STT session.
@@ -111,64 +227,138 @@ async def stt_session_task(
         audio_queue: Feed raw PCM bytes here. Push None to signal
             end-of-audio. On early close, unconsumed chunks remain in the
             queue for a respawned session to consume.
-        transcript_queue: Committed transcript strings appear here.
-            A None sentinel is pushed only on clean close. On error the
-            queue is left open so a new session can continue writing to it.
-        conversation_running: Event flag; clear it to request an early
-            stop of the sender loop.
+        transcript_queue: Committed transcript strings appear here. The
+            session is its only producer and there should be one consumer,
+            hence the single-producer/single-consumer queue. Consumers may
+            rely on its get_batch() (transcript_ingest_task() does), so pass
+            an AsyncSpscQueue, not an asyncio.Queue. A None sentinel is
+            pushed only on clean close. On error the queue is left open so a
+            new session can continue writing to it.
+        conversation_running: Event flag; cleared to request an early stop.
+            The receiver checks it on every event and exits, which cancels
+            the sender. The sender does not poll it: use stop_stt_session(),
+            which also pushes None so the sender ends the audio even while
+            it is waiting on an empty queue.
+        max_batch_bytes: If > 0, chunks that have piled up in audio_queue
+            (the sender fell behind) are merged into one send_audio() call of
+            up to this many bytes, saving per-frame overhead. Chunks are never
+            held back to wait for more, so latency is unchanged. 0 (default)
+            sends every chunk as is.
+        audio_ended: Optional event, set once the sender has consumed the
+            None sentinel from audio_queue. If the session then fails, the
+            queue holds no more audio, so a respawned session must not wait
+            for it (stt_session_with_respawn() checks this).
     """
 
     logger.debug("[STT] Initializing STT once...")
 
-    async def _sender() -> None:
+    async with provider:
+        logger.debug("[STT] Provider context entered, creating sender/receiver tasks...")
         try:
-            while conversation_running.is_set():
-                chunk = await audio_queue.get()
-                if chunk is None:
-                    break
-                await provider.send_audio(chunk)
+            async with asyncio.TaskGroup() as tg:
+                sender = tg.create_task(
+                    _stt_sender(provider, audio_queue, max_batch_bytes, audio_ended),
+                    name="stt-sender",
+                )
+                receiver = tg.create_task(
+                    _stt_receiver(provider, transcript_queue, conversation_running), name="stt-receiver",
+                )
+
+                # The receiver exits when the provider closes (cleanly or with error). In normal
+                # operation the sender has finished first (sent all audio + end_audio()). If the
+                # provider closes early, stop the sender from spinning on a dead connection.
+                def _stop_sender(_: asyncio.Task) -> None:
+                    if not sender.done():
+                        logger.warning("[STT] stt_session_task(): Explicitly cancelling sender task.")
+                        sender.cancel()
+
+                receiver.add_done_callback(_stop_sender)
+                logger.info("[STT] All tasks created, init successful, awaiting receiver...")
+        except ExceptionGroup as eg:
+            # Only the receiver can fail (the sender logs and swallows its errors).
+            # Re-raise the provider's exception itself rather than the group wrapper.
+            raise eg.exceptions[0] from None
         finally:
-            logger.debug("[STT] _sender() reached finally.")
-            await provider.end_audio()
+            logger.debug("[STT] stt_session_task(): reached finally.")
 
-    async def _receiver() -> None:
-        async for ev in provider.events():
-            logger.debug("[STT] _receiver(): received event: %r", ev)
-            if not conversation_running.is_set():
-                logger.warning("[STT] _receiver(): conversation_running is not set, breaking")
-                break
-            if ev.is_final and ev.text.strip():
-                logger.debug("[STT] _receiver(): putting in transcript_queue: %s", ev.text.strip()[:50])
-                await transcript_queue.put(ev.text.strip())
-                logger.debug("[STT] _receiver(): put completed, queue size now: %d", transcript_queue.qsize())
 
-        logger.debug("[STT] _receiver() reached finally. Putting stop token to the transcript_queue.")
-        await transcript_queue.put(None)
+def _respawn_delay(failed_retries: int, retry_delay: float, max_delay: float) -> float:
+    """
+    Exponential backoff with equal jitter: a random delay in [d/2, d],
+    where d = retry_delay * 2^(n-1) capped at max_delay.
+    """
+    # The exponent is capped too, so a long failure streak cannot overflow the float.
+    delay = min(retry_delay * (2 ** min(failed_retries - 1, 16)), max_delay)
+    return delay * (0.5 + random() * 0.5)
 
-    async with provider:
-        logger.debug("[STT] Provider context entered, creating sender/receiver tasks...")
-        sender = asyncio.create_task(_sender())
-        receiver = asyncio.create_task(_receiver())
-        logger.info("[STT] All tasks created, init successful, awaiting receiver...")
 
-        try:
-            # Await receiver — it exits when the provider closes (cleanly or with error).
-            # Sender runs concurrently as a background task; in normal operation it finishes
-            # first (sends all audio + end_audio()), then the provider closes and receiver
-            # exits. If the provider closes early (error), receiver exits first and we
-            # cancel sender to stop it from spinning on a dead connection.
-            await receiver
-        finally:
-            logger.debug("[STT] stt_session_task(): reached finally.")
+async def stt_session_with_respawn(
+        provider_factory: Callable[[], RealtimeSttProvider],
+        audio_queue: asyncio.Queue[Optional[PcmChunk]],
+        transcript_queue: AsyncSpscQueue[Optional[str]],
+        conversation_running: asyncio.Event,
+        *,
+        max_retries: int = STT_RESPAWN_MAX_RETRIES,
+        retry_delay: float = STT_RESPAWN_RETRY_DELAY_S,
+        max_delay: float = STT_RESPAWN_MAX_DELAY_S,
+        healthy_session_s: float = STT_RESPAWN_HEALTHY_SESSION_S,
+        max_batch_bytes: int = 0,
+) -> None:
+    """
+    Run stt_session_task(), respawning it on a fresh provider when the session fails.
+
+    Each attempt reuses the same audio_queue and transcript_queue (see "Respawn
+    design" in the module docstring), so the audio producer and the transcript
+    consumer do not notice the reconnect. Between attempts the function sleeps
+    for an exponentially growing, jittered delay (see _respawn_delay()).
+
+    No respawn is attempted when the failed session had already consumed the
+    None sentinel: all audio was sent, so the error is re-raised (a new
+    session would block on the drained audio_queue forever).
 
-            # done() is true in all cases of normal finish, cancel or exception.
-            if not sender.done():
-                logger.warning("[STT] stt_session_task(): Explicitly cancelling sender task.")
-                sender.cancel()
-
-            # Always await sender — even if it finished on its own with an exception —
-            # to prevent asyncio "Task exception was never retrieved" warnings.
-            try:
-                await sender
-            except (asyncio.CancelledError, Exception):
-                pass
+    Args:
+        provider_factory: Returns a new, not yet entered provider instance.
+            Providers are single-use, so every attempt needs its own.
+        audio_queue: Same as for stt_session_task().
+        transcript_queue: Same as for stt_session_task().
+        conversation_running: Same as for stt_session_task(). No respawn is
+            attempted once it has been cleared, also not when that happens
+            during the backoff sleep.
+        max_retries: Consecutive respawns allowed before the last error is
+            re-raised. A session that ran for at least healthy_session_s
+            resets the count, so occasional drops over a long conversation
+            never exhaust it.
+        retry_delay: Base delay in seconds before the first respawn.
+        max_delay: Upper bound for the (pre-jitter) delay in seconds.
+        healthy_session_s: Session duration after which a failure is treated
+            as a fresh one (backoff and retry count start over).
+        max_batch_bytes: Same as for stt_session_task().
+    """
+    failed_retries = 0
+    audio_ended = asyncio.Event()
+    while True:
+        started = monotonic()
+        try:
+            await stt_session_task(
+                provider_factory(), audio_queue, transcript_queue, conversation_running, max_batch_bytes,
+                audio_ended,
+            )
+            return
+        except Exception as e:
+            if audio_ended.is_set():
+                logger.warning("[STT] Session failed after end of audio (%r), not respawning.", e)
+                raise
+            if monotonic() - started >= healthy_session_s:
+                failed_retries = 0
+            failed_retries += 1
+            if failed_retries > max_retries or not conversation_running.is_set():
+                raise
+            delay = _respawn_delay(failed_retries, retry_delay, max_delay)
+            logger.warning(
+                "[STT] Session failed (%r), respawning in %.2fs (attempt %d/%d).",
+                e, delay, failed_retries, max_retries,
+            )
+            await asyncio.sleep(delay)
+            # A stop requested during the backoff must not open another connection.
+            if not conversation_running.is_set():
+                raise
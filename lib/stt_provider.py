@@ -19,7 +19,10 @@ A provider instance goes through three phases:
 
 3. **Streaming** — within the session, two concurrent operations run:
 
-   - ``send_audio(chunk)`` — feed raw PCM bytes (16 kHz, mono, 16-bit).
+   - ``send_audio(chunk)`` — feed raw PCM (16 kHz, mono, 16-bit) as a
+     ``PcmChunk``: ``bytes`` or a ``memoryview`` (helpers/stream_wav.py
+     yields zero-copy slices of the decoded file). Providers must accept
+     both; an API that only takes ``bytes`` converts with ``bytes(chunk)``.
      Call ``end_audio()`` once when all audio has been sent.
    - ``events()`` — async iterator yielding ``TranscriptEvent`` objects.
      Partial results have ``is_final=False``; committed segments have
@@ -47,7 +50,7 @@ Implementing a new provider
                # Close connection.
                ...
 
-           async def send_audio(self, pcm_chunk: bytes) -> None:
+           async def send_audio(self, pcm_chunk: PcmChunk) -> None:
                # Forward chunk to the provider (binary or base64).
                ...
 
@@ -61,8 +64,15 @@ Implementing a new provider
                # Committed transcripts: is_final=True
                ...
 
-   Most providers use an internal ``asyncio.Queue[TranscriptEvent]`` fed by
-   a background WebSocket listener task, with ``events()`` draining it.
+   Most providers use an internal event queue fed by a background WebSocket
+   listener task, with ``events()`` draining it. The listener is the only
+   producer and ``events()`` the only consumer, so an ``AsyncSpscQueue``
+   (lib/spsc_queue.py) fits. ``QueuedEventIterator`` implements that drain:
+   return it from ``events()`` and push None into the queue when the listener
+   stops.
+
+   To send fewer, larger audio frames, a provider can hold chunks back with
+   ``AudioChunkBatcher`` (exposed as ``send_batch_chunks`` in its config).
 
 4. Add a test method in ``tests/test_stt.py`` and a benchmark entry in
    ``benchmark.py``.
@@ -71,10 +81,13 @@ Implementing a new provider
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import AsyncIterator, Protocol
+from typing import AsyncIterator, Callable, Optional, Protocol
+
+# A chunk of raw PCM audio as it travels through audio queues and send_audio().
+PcmChunk = bytes | memoryview
 
 
-@dataclass(frozen=True, init=True)
+@dataclass(frozen=True, slots=True)
 class TranscriptEvent:
     """
     A single transcript event from an STT provider.
@@ -99,7 +112,83 @@ class RealtimeSttProvider(Protocol):
     async def __aenter__(self) -> "RealtimeSttProvider": ...
     async def __aexit__(self, exc_type, exc, tb) -> None: ...
 
-    async def send_audio(self, pcm_chunk: bytes) -> None: ...
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None: ...
     async def end_audio(self) -> None: ...
 
     def events(self) -> AsyncIterator[TranscriptEvent]: ...
+
+
+class AudioChunkBatcher:
+    """
+    Merges every n consecutive PCM chunks into one for a provider's send_audio().
+
+    Fewer, larger frames per second save the per-send overhead (await, frame
+    header, masking, socket write) at the cost of up to (n - 1) chunks of extra
+    latency. Unlike stt_session_task(max_batch_bytes=...), which only merges a
+    backlog already waiting in the audio queue and never delays a chunk, this
+    always holds chunks back — use it when the provider or the network prefers
+    a lower frame rate. Call flush() in end_audio() so no audio is lost.
+
+    Args:
+        n: Number of chunks per merged chunk (> 1; 1 would mean no batching).
+    """
+    __slots__ = ("_n", "_buf", "_count")
+
+    def __init__(self, n: int) -> None:
+        self._n = n
+        self._buf = bytearray()
+        self._count = 0
+
+    def add(self, pcm_chunk: PcmChunk) -> Optional[bytes]:
+        """Buffer a chunk; return the merged audio once n chunks are collected, else None."""
+        self._buf += pcm_chunk
+        self._count += 1
+        if self._count < self._n:
+            return None
+        return self.flush()
+
+    def flush(self) -> Optional[bytes]:
+        """Return the audio held back so far as one chunk (None if there is none) and reset."""
+        if not self._buf:
+            return None
+        pcm = bytes(self._buf)
+        self._buf.clear()
+        self._count = 0
+        return pcm
+
+
+class QueuedEventIterator:
+    """
+    Async iterator over a provider's internal event queue.
+
+    Yields TranscriptEvents until a None sentinel arrives. Then it raises the
+    provider's error if the session failed, or ends the iteration on a clean
+    close. A plain class with __anext__ instead of an async generator, so each
+    step is a single coroutine call without generator frame switching.
+
+    Args:
+        queue: Any queue with an async get() (asyncio.Queue, AsyncSpscQueue).
+        get_error: Returns the provider's stored error, if any. Called only
+            once the sentinel has been received.
+    """
+    __slots__ = ("_queue", "_get_error", "_done")
+
+    def __init__(self, queue, get_error: Callable[[], Optional[Exception]]) -> None:
+        self._queue = queue
+        self._get_error = get_error
+        self._done = False
+
+    def __aiter__(self) -> "QueuedEventIterator":
+        return self
+
+    async def __anext__(self) -> TranscriptEvent:
+        if self._done:
+            raise StopAsyncIteration
+        ev = await self._queue.get()
+        if ev is None:
+            self._done = True
+            error = self._get_error()
+            if error:
+                raise error
+            raise StopAsyncIteration
+        return ev
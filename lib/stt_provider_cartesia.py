@@ -1,19 +1,26 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import re
 from dataclasses import dataclass
-from logging import getLogger
+from logging import getLogger, DEBUG
 from typing import AsyncIterator, Optional
 from urllib.parse import urlencode
 
 from websockets import connect, ConnectionClosedOK, ConnectionClosed
 
 from config import AUDIO_SAMPLE_RATE, AUDIO_ENCODING, STT_LANGUAGE_ISO_639_1, STT_VAD_SILENCE_THRESHOLD_S
-from lib.stt_provider import RealtimeSttProvider, TranscriptEvent
+from lib.fast_json import loads
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt_provider import PcmChunk, QueuedEventIterator, RealtimeSttProvider, TranscriptEvent
 
 logger = getLogger(__name__)
 
+# Interim transcripts make up most of the traffic and are discarded anyway; matching
+# this is far cheaper than parsing the JSON. Whitespace-tolerant, so a change in the
+# server's JSON formatting only costs the shortcut, never a committed transcript.
+_INTERIM_TRANSCRIPT_RE = re.compile(r'"is_final"\s*:\s*false')
+
 
 @dataclass(frozen=True)
 class CartesiaSttConfig:
@@ -52,26 +59,26 @@ class CartesiaInkProvider(RealtimeSttProvider):
     def __init__(self, cfg: CartesiaSttConfig) -> None:
         self._cfg = cfg
         self._ws = None
-        self._events_q: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue(maxsize=200)
+        self._events_q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
         self._rx_task: Optional[asyncio.Task] = None
         self._closed = asyncio.Event()
         self._error: Optional[Exception] = None  # Store error for propagation
 
-    async def __aenter__(self) -> "CartesiaInkProvider":
         # Query params required by Cartesia streaming STT endpoint. :contentReference[oaicite:2]{index=2}
-        qs = urlencode({
-            "model": self._cfg.model,
-            "language": self._cfg.language,
-            "encoding": self._cfg.encoding,
-            "sample_rate": str(self._cfg.sample_rate),
-            "min_volume": str(self._cfg.min_volume),
-            "max_silence_duration_secs": str(self._cfg.max_silence_duration_secs),
+        # The config is frozen, so the URL is built once rather than on every (re)connect.
+        self._url = f"{cfg.base_url}?" + urlencode({
+            "model": cfg.model,
+            "language": cfg.language,
+            "encoding": cfg.encoding,
+            "sample_rate": str(cfg.sample_rate),
+            "min_volume": str(cfg.min_volume),
+            "max_silence_duration_secs": str(cfg.max_silence_duration_secs),
         })
-        url = f"{self._cfg.base_url}?{qs}"
 
+    async def __aenter__(self) -> "CartesiaInkProvider":
         # Auth: Cartesia requires X-API-Key and Cartesia-Version headers.
         self._ws = await connect(
-            url,
+            self._url,
             additional_headers={
                 "X-API-Key": self._cfg.api_key,
                 "Cartesia-Version": "2025-04-16",
@@ -98,14 +105,20 @@ class CartesiaInkProvider(RealtimeSttProvider):
                     pass
         finally:
             # Always terminate events() iterator
-            try:
-                await self._events_q.put(None)
-            except Exception:
-                pass
+            self._events_q.put_nowait(None)  # unbounded: never blocks or raises
             self._ws = None
             self._rx_task = None
 
-    async def send_audio(self, pcm_chunk: bytes) -> None:
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None:
+        """
+        Send raw PCM as one binary WebSocket message.
+
+        Cartesia treats the binary messages as one continuous stream, so chunk
+        boundaries do not matter and the session sender can merge a backlog into
+        a single call (stt_session_task(max_batch_bytes=...)). Passing a list to
+        ws.send() would not help: websockets sends an iterable as fragments of
+        one message, not as separate messages.
+        """
         # Cartesia expects raw binary audio frames. :contentReference[oaicite:4]{index=4}
         if self._error:
             raise self._error
@@ -126,16 +139,8 @@ class CartesiaInkProvider(RealtimeSttProvider):
             pass
 
     def events(self) -> AsyncIterator[TranscriptEvent]:
-        async def _aiter() -> AsyncIterator[TranscriptEvent]:
-            while True:
-                ev = await self._events_q.get()
-                if ev is None:
-                    # Check if we stopped due to an error
-                    if self._error:
-                        raise self._error
-                    break
-                yield ev
-        return _aiter()
+        """Async iterator yielding committed transcript events; raises the stored error on failure."""
+        return QueuedEventIterator(self._events_q, lambda: self._error)
 
     @property
     def error(self) -> Optional[Exception]:
@@ -143,10 +148,13 @@ class CartesiaInkProvider(RealtimeSttProvider):
         return self._error
 
     async def _recv_loop(self) -> None:
+        # Checked once per session: skips building log records for every (mostly interim) message.
+        debug = logger.isEnabledFor(DEBUG)
         try:
             while not self._closed.is_set():
                 msg = await self._ws.recv()
-                logger.debug("[STT] Cartesia: received message: %r", msg)
+                if debug:
+                    logger.debug("[STT] Cartesia: received message: %r", msg)
 
                 # Cartesia sends JSON text messages for transcripts / acknowledgements. :contentReference[oaicite:6]{index=6}
                 if isinstance(msg, bytes):
@@ -154,16 +162,30 @@ class CartesiaInkProvider(RealtimeSttProvider):
                     logger.warning("[STT] Cartesia: received unexpected message: %r", msg)
                     continue
 
-                data = json.loads(msg)
+                if _INTERIM_TRANSCRIPT_RE.search(msg):
+                    continue
+
+                data = loads(msg)
                 typ = data.get("type")
 
                 if typ == "transcript":
-                    text = (data.get("text") or "").strip()
-                    is_final = bool(data.get("is_final", False))
-                    if is_final and text:
+                    # Transcript messages always carry "text" and "is_final" per the Cartesia schema.
+                    try:
+                        text = data["text"]
+                        is_final = data["is_final"]
+                    except KeyError:
+                        logger.warning("[STT] Cartesia: malformed transcript message: %r", data)
+                        continue
+                    if not is_final:
+                        if debug:
+                            logger.debug("[STT] Cartesia: interim transcript: %s", text)
+                        continue
+                    if not text:
+                        # Empty or null text: nothing to emit.
+                        continue
+                    text = text.strip()
+                    if text:
                         await self._events_q.put(TranscriptEvent(text=text, is_final=True))
-                    else:
-                        logger.debug("[STT] Cartesia: type %s, text %s", typ, text)
                     continue
 
                 if typ in ("flush_done",):
@@ -202,4 +224,4 @@ class CartesiaInkProvider(RealtimeSttProvider):
                 self._error = e
         finally:
             self._closed.set()
-            await self._events_q.put(None)
+            self._events_q.put_nowait(None)
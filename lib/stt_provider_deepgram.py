@@ -1,19 +1,43 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import re
 from dataclasses import dataclass
 from logging import getLogger
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, Awaitable, Callable, Optional
 from urllib.parse import urlencode
 
 from websockets import connect, ConnectionClosedOK, ConnectionClosed
 
 from config import AUDIO_SAMPLE_RATE, AUDIO_CHANNELS, STT_VAD_SILENCE_THRESHOLD_S, STT_LANGUAGE_ISO_639_1
-from lib.stt_provider import RealtimeSttProvider, TranscriptEvent
+from lib.fast_json import loads
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt_provider import (
+    AudioChunkBatcher,
+    PcmChunk,
+    QueuedEventIterator,
+    RealtimeSttProvider,
+    TranscriptEvent,
+)
 
 logger = getLogger(__name__)
 
+# Deepgram message types
+STT_MSG_RESULTS = "Results"
+STT_MSG_ERROR = "Error"
+STT_INFO_TYPES = frozenset({
+    "Metadata",
+    "UtteranceEnd",
+    "SpeechStarted",
+})
+
+# Control messages are constant: pre-serialized, sent as text frames (text=True).
+STT_MSG_CLOSE_STREAM = b'{"type":"CloseStream"}'
+
+# Interim results (interim_results=true) are most of the traffic and are dropped unparsed.
+# Whitespace-tolerant; if the formatting ever changes the message simply gets parsed.
+_INTERIM_RESULT_RE = re.compile(rb'"is_final"\s*:\s*false')
+
 
 @dataclass(frozen=True)
 class DeepgramSttConfig:
@@ -42,29 +66,40 @@ class DeepgramSttConfig:
     # endpointing is milliseconds as string in Deepgram query (or false)
     endpointing_ms: int = int(STT_VAD_SILENCE_THRESHOLD_S * 1000)
 
+    # Merge every n audio chunks into one frame (see AudioChunkBatcher). 1 = off.
+    send_batch_chunks: int = 1
+
 
 class DeepgramRealtimeProvider(RealtimeSttProvider):
     """
     Deepgram Live Audio WebSocket streaming provider.
 
     - Sends binary audio frames (raw PCM).
-    - Sends {"type":"Finalize"} to flush.
+    - Sends {"type":"CloseStream"} to flush and close.
     - Emits TranscriptEvent only when Deepgram marks result as final.
     """
 
     def __init__(self, cfg: DeepgramSttConfig) -> None:
         self._cfg = cfg
         self._ws = None
-        self._events_q: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue(maxsize=200)
+        self._events_q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
         self._rx_task: Optional[asyncio.Task] = None
-        self._closed = asyncio.Event()
+        self._closed = False  # plain flag: only touched from the event loop
         self._error: Optional[Exception] = None
+        self._batcher = AudioChunkBatcher(cfg.send_batch_chunks) if cfg.send_batch_chunks > 1 else None
 
-    async def __aenter__(self) -> "DeepgramRealtimeProvider":
-        # Validate API key
-        if not self._cfg.api_key:
-            raise ValueError("Deepgram API key is required")
+        # Message type -> handler. One dict lookup per message instead of a chain of comparisons.
+        self._handlers: dict[str, Callable[[dict], Awaitable[None]]] = {
+            STT_MSG_RESULTS: self._on_results,
+            **dict.fromkeys(STT_INFO_TYPES, self._on_info),
+        }
 
+        # The config is frozen: build the URL and auth header once, not on every (re)connect.
+        self._url = self._build_url()
+        self._headers = {"Authorization": f"token {cfg.api_key}"}
+
+    def _build_url(self) -> str:
+        """Build WebSocket URL with query parameters."""
         qs = urlencode(
             {
                 "model": self._cfg.model,
@@ -78,8 +113,14 @@ class DeepgramRealtimeProvider(RealtimeSttProvider):
                 "endpointing": str(self._cfg.endpointing_ms),
             }
         )
-        url = f"{self._cfg.base_url}?{qs}"
-        logger.debug("[STT] Deepgram: connecting to %s", url)
+        return f"{self._cfg.base_url}?{qs}"
+
+    async def __aenter__(self) -> "DeepgramRealtimeProvider":
+        # Validate API key
+        if not self._cfg.api_key:
+            raise ValueError("Deepgram API key is required")
+
+        logger.debug("[STT] Deepgram: connecting to %s", self._url)
 
         # Connect with timeout to avoid hanging indefinitely
         # Use additional_headers with lowercase 'token' per Deepgram examples
@@ -87,8 +128,8 @@ class DeepgramRealtimeProvider(RealtimeSttProvider):
         try:
             self._ws = await asyncio.wait_for(
                 connect(
-                    url,
-                    additional_headers={"Authorization": f"token {self._cfg.api_key}"},
+                    self._url,
+                    additional_headers=self._headers,
                     open_timeout=10,
                     ping_interval=10,
                     ping_timeout=10,
@@ -107,7 +148,7 @@ class DeepgramRealtimeProvider(RealtimeSttProvider):
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
         try:
-            self._closed.set()
+            self._closed = True
             if self._rx_task:
                 self._rx_task.cancel()
 
@@ -118,102 +159,111 @@ class DeepgramRealtimeProvider(RealtimeSttProvider):
                     pass
         finally:
             # Always terminate iterator
-            try:
-                await self._events_q.put(None)
-            except Exception:
-                pass
+            self._events_q.put_nowait(None)  # unbounded: never blocks or raises
             self._ws = None
             self._rx_task = None
 
-    async def send_audio(self, pcm_chunk: bytes) -> None:
-        """Send audio chunk to Deepgram (binary PCM frames)."""
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None:
+        """
+        Send audio chunk to Deepgram (binary PCM frames).
+
+        Client frames must be masked; websockets does that in its bundled C extension
+        (websockets.speedups, part of the regular wheels), so the per-frame cost is the
+        await and the socket write. To send fewer, larger frames, let the session
+        sender merge a backlog (stt_session_task(max_batch_bytes=...)) or always
+        merge a fixed number of chunks (DeepgramSttConfig.send_batch_chunks).
+        """
         if self._error:
             raise self._error
-        if self._closed.is_set() or self._ws is None:
+        if self._closed or self._ws is None:
             logger.warning("[STT] Deepgram: cannot send audio, connection closed")
             return
+        if self._batcher is not None:
+            pcm_chunk = self._batcher.add(pcm_chunk)
+            if pcm_chunk is None:
+                return
         try:
             await self._ws.send(pcm_chunk)
         except ConnectionClosed:
             logger.warning("[STT] Deepgram: connection closed while sending audio")
-            self._closed.set()
+            self._closed = True
 
     async def end_audio(self) -> None:
         """
-        Flush the stream. Deepgram recommends sending a Finalize message. :contentReference[oaicite:4]{index=4}
-        """
-        try:
-            await self._ws.send(json.dumps({"type": "Finalize"}))
-            await asyncio.sleep(0.25)  # give Deepgram time to flush final results
-        except Exception:
-            pass
+        Signal end of audio with CloseStream. :contentReference[oaicite:4]{index=4}
 
-        # Optionally close the stream explicitly.
+        CloseStream makes Deepgram process all buffered audio, send the remaining
+        final results and Metadata, and then close the connection — so the receiver
+        gets every transcript before ConnectionClosedOK. A preceding Finalize (plus
+        a sleep to let it land) is not needed: CloseStream already implies it.
+        Audio still held back by send_batch_chunks is sent first.
+        """
         try:
-            await self._ws.send(json.dumps({"type": "CloseStream"}))
+            if self._batcher is not None and (pcm := self._batcher.flush()) is not None:
+                await self._ws.send(pcm)
+            await self._ws.send(STT_MSG_CLOSE_STREAM, text=True)
         except Exception:
             pass
 
     def events(self) -> AsyncIterator[TranscriptEvent]:
-        """Async iterator yielding transcript events."""
-        async def _aiter() -> AsyncIterator[TranscriptEvent]:
-            while True:
-                ev = await self._events_q.get()
-                if ev is None:
-                    if self._error:
-                        raise self._error
-                    break
-                yield ev
-        return _aiter()
+        """Async iterator yielding committed transcript events; raises the stored error on failure."""
+        return QueuedEventIterator(self._events_q, lambda: self._error)
 
     @property
     def error(self) -> Optional[Exception]:
         """Return the error that caused the connection to close, if any."""
         return self._error
 
+    async def _on_results(self, data: dict) -> None:
+        """Emit the transcript of a final Results message; interim results are skipped."""
+        if not data.get("is_final", False):
+            # Intermediate results - log but don't emit
+            # logger.debug("[STT] Deepgram intermediate transcript: %r", data)
+            return
+
+        # Transcript lives here: channel.alternatives[0].transcript
+        try:
+            text = data["channel"]["alternatives"][0]["transcript"].strip()
+        except (KeyError, IndexError, TypeError):
+            # No alternatives (or a null field): nothing to emit.
+            return
+        if text:
+            logger.debug("[STT] Deepgram: final transcript: %.50s", text)
+            await self._events_q.put(TranscriptEvent(text=text, is_final=True))
+
+    async def _on_info(self, data: dict) -> None:
+        """Informational messages (Metadata, UtteranceEnd, SpeechStarted) are only logged."""
+        logger.debug("[STT] Deepgram: received %s", data.get("type"))
+
     async def _recv_loop(self) -> None:
         """
         Receives Deepgram JSON messages.
         We only emit committed/final transcripts when message type is Results and is_final is true.
         """
         logger.debug("[STT] Deepgram: _recv_loop started, waiting for messages...")
+        # Bound once: looked up for every message otherwise.
+        handlers = self._handlers
+        recv = self._ws.recv
+        is_interim = _INTERIM_RESULT_RE.search
         try:
-            while not self._closed.is_set():
-                msg = await self._ws.recv()
-                # logger.debug("[STT] Deepgram: received message type: %s", type(msg).__name__)
+            while not self._closed:
+                # Deepgram only sends JSON text frames. decode=False hands over the raw UTF-8
+                # payload, skipping the str decode: both the prefilter and loads() take bytes.
+                msg = await recv(decode=False)
 
-                if isinstance(msg, (bytes, bytearray)):
-                    # Deepgram sends JSON text; ignore unexpected bytes.
-                    logger.warning("[STT] Deepgram: received unexpected binary message %r", msg)
+                if is_interim(msg):
                     continue
 
-                data = json.loads(msg)
+                data = loads(msg)
                 typ = data.get("type")
 
-                if typ == "Results":
-                    if not data.get("is_final", False):
-                        # Intermediate results - log but don't emit
-                        # logger.debug("[STT] Deepgram intermediate transcript: %r", data)
-                        continue
-
-                    # Transcript lives here: channel.alternatives[0].transcript
-                    channel = data.get("channel") or {}
-                    alts = channel.get("alternatives") or []
-                    if not alts:
-                        continue
-
-                    text = (alts[0].get("transcript") or "").strip()
-                    if text:
-                        logger.debug("[STT] Deepgram: final transcript: %s", text[:50])
-                        await self._events_q.put(TranscriptEvent(text=text, is_final=True))
-                    continue
-
-                if typ in ("Metadata", "UtteranceEnd", "SpeechStarted"):
-                    logger.debug("[STT] Deepgram: received %s", typ)
+                handler = handlers.get(typ)
+                if handler is not None:
+                    await handler(data)
                     continue
 
                 # Deepgram errors typically come as {"type":"Error", ...} or {"error": "..."}
-                if typ == "Error" or "error" in data:
+                if typ == STT_MSG_ERROR or "error" in data:
                     error_msg = data.get("message", str(data))
                     self._error = RuntimeError(f"Deepgram STT error: {error_msg}")
                     logger.error("[STT] Deepgram: %s", self._error)
@@ -237,5 +287,5 @@ class DeepgramRealtimeProvider(RealtimeSttProvider):
             if not self._error:
                 self._error = e
         finally:
-            self._closed.set()
-            await self._events_q.put(None)
+            self._closed = True
+            self._events_q.put_nowait(None)
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-import base64
+import binascii
+import re
 from dataclasses import dataclass
-from json import loads, dumps
+from functools import partial
 from logging import getLogger
-from typing import AsyncIterator, Optional
+from time import monotonic
+from typing import AsyncIterator, Awaitable, Callable, Optional
 from urllib.parse import urlencode
 
+try:
+    import pybase64
+except ImportError:  # optional dependency
+    pybase64 = None
+
 from websockets import connect, ConnectionClosedOK, ConnectionClosed
 
 from config import (
@@ -18,17 +25,31 @@ from config import (
     STT_MIN_SPEECH_DURATION_MS,
     STT_VAD_THRESHOLD,
 )
-from lib.stt_provider import RealtimeSttProvider, TranscriptEvent
+from lib.fast_json import loads
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt_provider import (
+    AudioChunkBatcher,
+    PcmChunk,
+    QueuedEventIterator,
+    RealtimeSttProvider,
+    TranscriptEvent,
+)
 
 
 logger = getLogger(__name__)
 
+# Base64 for the audio payload: pybase64 (SIMD) when installed, else the stdlib C routine.
+_b64encode = pybase64.b64encode if pybase64 is not None else partial(binascii.b2a_base64, newline=False)
+
 
 # ElevenLabs message types
 STT_MSG_SESSION_STARTED = "session_started"
 STT_MSG_PARTIAL_TRANSCRIPT = "partial_transcript"
 STT_MSG_COMMITTED_TRANSCRIPT = "committed_transcript"
 STT_MSG_COMMITTED_TRANSCRIPT_TS = "committed_transcript_with_timestamps"
+# Keepalive: a single space keeps an idle session open (an empty string would close it).
+# Pre-encoded and sent as a text frame (text=True).
+STT_KEEPALIVE = b" "
 STT_ERROR_TYPES = frozenset({
     "scribeError",
     "scribeAuthError",
@@ -36,6 +57,10 @@ STT_ERROR_TYPES = frozenset({
     "queue_overflow",
 })
 
+# Partial transcripts are most of the traffic and are discarded: dropped unparsed.
+# Whitespace-tolerant; if the formatting ever changes the message simply gets parsed.
+_PARTIAL_TRANSCRIPT_RE = re.compile(rb'"message_type"\s*:\s*"partial_transcript"')
+
 
 @dataclass(frozen=True)
 class ElevenLabsSttConfig:
@@ -52,6 +77,11 @@ class ElevenLabsSttConfig:
     model: str = "scribe_v2_realtime"
     base_url: str = "wss://api.elevenlabs.io/v1/speech-to-text/realtime"
     commit_strategy: str = "vad"
+    # The server closes the session after 20 s without input. If no audio has been sent
+    # for this long, a keepalive is sent instead. 0 disables the keepalive.
+    keepalive_interval_s: float = 15.0
+    # Merge every n audio chunks into one message (see AudioChunkBatcher). 1 = off.
+    send_batch_chunks: int = 1
 
     # Universal STT settings (defaults from config.py, can be overridden)
     sample_rate: int = AUDIO_SAMPLE_RATE
@@ -75,10 +105,31 @@ class ElevenLabsRealtimeProvider(RealtimeSttProvider):
     def __init__(self, cfg: ElevenLabsSttConfig) -> None:
         self._cfg = cfg
         self._ws = None
-        self._events_q: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue(maxsize=200)
+        self._events_q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
         self._rx_task: Optional[asyncio.Task] = None
-        self._closed = asyncio.Event()
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._closed = False  # plain flag: only touched from the event loop
         self._error: Optional[Exception] = None
+        self._last_send: float = 0.0  # monotonic time of the last message sent
+        self._batcher = AudioChunkBatcher(cfg.send_batch_chunks) if cfg.send_batch_chunks > 1 else None
+
+        # The config is frozen: build the URL and auth header once, not on every (re)connect.
+        self._url = self._build_url()
+        self._headers = {"xi-api-key": cfg.api_key}
+
+        # input_audio_chunk envelope, pre-serialized once: send_audio() only splices the
+        # base64 audio in between, instead of building and json-encoding a dict per chunk.
+        self._audio_msg_prefix = (
+            b'{"message_type":"input_audio_chunk","sample_rate":%d,"audio_base_64":"' % cfg.sample_rate
+        )
+        self._audio_msg_suffix = b'"}'
+
+        # Message type -> handler.
+        self._handlers: dict[str, Callable[[dict], Awaitable[None]]] = {
+            STT_MSG_PARTIAL_TRANSCRIPT: self._on_partial_transcript,
+            STT_MSG_COMMITTED_TRANSCRIPT: self._on_committed_transcript,
+            STT_MSG_COMMITTED_TRANSCRIPT_TS: self._on_committed_transcript,
+        }
 
     def _build_url(self) -> str:
         """Build WebSocket URL with query parameters."""
@@ -105,22 +156,25 @@ class ElevenLabsRealtimeProvider(RealtimeSttProvider):
         as sending a fully empty string, "", will close the WebSocket.
         Elevenlabs doc: https://elevenlabs.io/docs/developers/websockets#tips
 
+        This is handled by _keepalive_loop(), which sends the space only after
+        keepalive_interval_s without any audio — while audio flows, nothing extra is sent.
+
         @TODO: Send previous text as context
             Sending previous_text context is only possible when sending the first audio chunk via connection.send().
             Sending it in subsequent chunks will result in an error.
             Previous text works best when it’s under 50 characters long.
             https://elevenlabs.io/docs/developers/guides/cookbooks/speech-to-text/realtime/transcripts-and-commit-strategies#sending-previous-text-context
         """
-        url = self._build_url()
-        headers = {"xi-api-key": self._cfg.api_key}
-
         self._ws = await connect(
-            url,
-            additional_headers=headers,
+            self._url,
+            additional_headers=self._headers,
             ping_interval=10,
             ping_timeout=10,
             close_timeout=5,
             max_queue=32,
+            # permessage-deflate buys nothing on base64 audio (and small JSON replies) but costs
+            # a zlib pass per frame on both ends.
+            compression=None,
         )
 
         # Verify handshake
@@ -131,85 +185,127 @@ class ElevenLabsRealtimeProvider(RealtimeSttProvider):
         logger.info("[STT] ElevenLabs: session started.")
 
         self._rx_task = asyncio.create_task(self._recv_loop())
+        self._last_send = monotonic()
+        if self._cfg.keepalive_interval_s > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
         try:
-            self._closed.set()
+            self._closed = True
             if self._rx_task:
                 self._rx_task.cancel()
+            if self._keepalive_task:
+                self._keepalive_task.cancel()
             if self._ws:
                 try:
                     await self._ws.close()
                 except Exception:
                     pass
         finally:
-            try:
-                await self._events_q.put(None)
-            except Exception:
-                pass
+            self._events_q.put_nowait(None)  # unbounded: never blocks or raises
             self._ws = None
             self._rx_task = None
+            self._keepalive_task = None
+
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None:
+        """
+        Send audio chunk to ElevenLabs (base64-encoded in JSON).
 
-    async def send_audio(self, pcm_chunk: bytes) -> None:
-        """Send audio chunk to ElevenLabs (base64-encoded in JSON)."""
+        Unlike Cartesia, Deepgram and Speechmatics, the realtime endpoint has no
+        binary audio frame — audio is only accepted as the audio_base_64 field
+        of an input_audio_chunk message, so the encoding cannot be skipped.
+        With send_batch_chunks > 1 the raw PCM is merged before encoding, so one
+        message carries several chunks.
+        """
         if self._error:
             raise self._error
-        if self._closed.is_set() or self._ws is None:
+        if self._closed or self._ws is None:
             logger.warning("[STT] ElevenLabs: cannot send audio, connection closed")
             return
+        if self._batcher is not None:
+            pcm_chunk = self._batcher.add(pcm_chunk)
+            if pcm_chunk is None:
+                return
         try:
-            payload = {
-                "message_type": "input_audio_chunk",
-                "audio_base_64": base64.b64encode(pcm_chunk).decode("ascii"),
-                "sample_rate": self._cfg.sample_rate,
-            }
-            await self._ws.send(dumps(payload))
+            await self._ws.send(self._audio_message(pcm_chunk), text=True)
+            self._last_send = monotonic()
         except ConnectionClosed:
             logger.warning("[STT] ElevenLabs: connection closed while sending audio")
-            self._closed.set()
+            self._closed = True
+
+    def _audio_message(self, pcm_chunk: PcmChunk) -> bytes:
+        """Build an input_audio_chunk message (UTF-8 JSON) carrying pcm_chunk."""
+        # Base64 output needs no JSON escaping; the caller sends it with text=True.
+        return b"".join((self._audio_msg_prefix, _b64encode(pcm_chunk), self._audio_msg_suffix))
 
     async def end_audio(self) -> None:
-        """Signal end of audio stream."""
+        """Signal end of audio stream; audio still held back by send_batch_chunks is sent first."""
         if self._ws:
             try:
+                if self._batcher is not None and (pcm := self._batcher.flush()) is not None:
+                    await self._ws.send(self._audio_message(pcm), text=True)
                 await self._ws.close()
             except Exception:
                 pass
 
     def events(self) -> AsyncIterator[TranscriptEvent]:
-        """Async iterator yielding transcript events."""
-        async def _aiter() -> AsyncIterator[TranscriptEvent]:
-            while True:
-                ev = await self._events_q.get()
-                if ev is None:
-                    if self._error:
-                        raise self._error
-                    break
-                yield ev
-        return _aiter()
+        """Async iterator yielding committed transcript events; raises the stored error on failure."""
+        return QueuedEventIterator(self._events_q, lambda: self._error)
 
     @property
     def error(self) -> Optional[Exception]:
         """Return the error that caused the connection to close, if any."""
         return self._error
 
+    async def _keepalive_loop(self) -> None:
+        """Background task keeping the session open while no audio is being sent."""
+        interval = self._cfg.keepalive_interval_s
+        try:
+            while not self._closed:
+                idle_s = monotonic() - self._last_send
+                if idle_s < interval:
+                    await asyncio.sleep(interval - idle_s)
+                    continue
+                logger.debug("[STT] ElevenLabs: no audio for %.1fs, sending keepalive.", idle_s)
+                await self._ws.send(STT_KEEPALIVE, text=True)
+                self._last_send = monotonic()
+        except ConnectionClosed:
+            logger.debug("[STT] ElevenLabs: keepalive stopped, connection closed.")
+
+    async def _on_partial_transcript(self, data: dict) -> None:
+        """Partial transcripts are not used — only committed segments are emitted."""
+
+    async def _on_committed_transcript(self, data: dict) -> None:
+        # Committed messages always carry "text" per the ElevenLabs schema.
+        try:
+            text = data["text"].strip()
+        except KeyError:
+            logger.warning("[STT] ElevenLabs: committed transcript without text: %r", data)
+            return
+        if text:
+            logger.debug("[STT] ElevenLabs: committed transcript: %.50s", text)
+            await self._events_q.put(TranscriptEvent(text=text, is_final=True))
+
     async def _recv_loop(self) -> None:
         """Background task receiving messages from WebSocket."""
+        handlers = self._handlers
+        recv = self._ws.recv
+        is_partial = _PARTIAL_TRANSCRIPT_RE.search
         try:
-            while not self._closed.is_set():
-                reply = await self._ws.recv()
+            while not self._closed:
+                # JSON text frames only. decode=False hands over the raw UTF-8 payload, skipping
+                # the str decode: both the prefilter and loads() take bytes.
+                reply = await recv(decode=False)
+                if is_partial(reply):
+                    continue
+
                 data = loads(reply)
                 msg_type = data.get("message_type")
 
-                if msg_type == STT_MSG_PARTIAL_TRANSCRIPT:
-                    continue
-
-                if msg_type in (STT_MSG_COMMITTED_TRANSCRIPT, STT_MSG_COMMITTED_TRANSCRIPT_TS):
-                    text = data.get("text", "").strip()
-                    if text:
-                        logger.debug("[STT] ElevenLabs: committed transcript: %s", text[:50])
-                        await self._events_q.put(TranscriptEvent(text=text, is_final=True))
+                handler = handlers.get(msg_type)
+                if handler is not None:
+                    await handler(data)
                     continue
 
                 if msg_type in STT_ERROR_TYPES:
@@ -237,5 +333,5 @@ class ElevenLabsRealtimeProvider(RealtimeSttProvider):
             if not self._error:
                 self._error = e
         finally:
-            self._closed.set()
-            await self._events_q.put(None)
\ No newline at end of file
+            self._closed = True
+            self._events_q.put_nowait(None)
\ No newline at end of file
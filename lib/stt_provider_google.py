@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import traceback
 from dataclasses import dataclass
 from logging import getLogger
 from typing import AsyncIterator, Optional
@@ -9,10 +8,17 @@ from typing import AsyncIterator, Optional
 from google.cloud import speech
 
 from config import AUDIO_SAMPLE_RATE, STT_LANGUAGE_BCP_47
-from lib.stt_provider import RealtimeSttProvider, TranscriptEvent
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt_provider import PcmChunk, QueuedEventIterator, RealtimeSttProvider, TranscriptEvent
 
 logger = getLogger(__name__)
 
+# Raw protobuf class behind the proto-plus StreamingRecognizeRequest. Audio requests are built
+# on it and wrap()ped without a copy, which costs about half of the wrapper's own constructor
+# (that one marshals every field). A request pool is not an option: gRPC serializes the
+# yielded request later, so a reused object could be overwritten before it is sent.
+_StreamingRecognizeRequestPb = speech.StreamingRecognizeRequest.pb()
+
 
 @dataclass(frozen=True)
 class GoogleSttConfig:
@@ -41,7 +47,8 @@ class GoogleRealtimeProvider(RealtimeSttProvider):
     Google Cloud Speech-to-Text v1 streaming adapter.
 
     Library: google-cloud-speech
-    Uses: SpeechClient.streaming_recognize(streaming_config, requests)
+    Uses: SpeechAsyncClient.streaming_recognize(requests) — natively async, so the
+    stream runs as a task on the event loop (no worker thread, no cross-thread handoff).
 
     Authentication: Uses Application Default Credentials (ADC).
     Set GOOGLE_APPLICATION_CREDENTIALS env var to your service account JSON.
@@ -49,27 +56,29 @@ class GoogleRealtimeProvider(RealtimeSttProvider):
 
     def __init__(self, cfg: Optional[GoogleSttConfig] = None) -> None:
         self._cfg = cfg or GoogleSttConfig()
-        self._audio_q: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=400)
-        self._events_q: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue(maxsize=200)
+        # One producer and one consumer each: send_audio() -> request_iter() and
+        # _stream_loop() -> events(). The audio queue is bounded, so a stalled gRPC stream
+        # pushes back on the session sender (which otherwise drains its own queue into this
+        # one without limit). The events queue is unbounded: put_nowait() never blocks or raises.
+        self._audio_q: AsyncSpscQueue[Optional[PcmChunk]] = AsyncSpscQueue(maxsize=400)
+        self._events_q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
         self._closed = asyncio.Event()
         self._error: Optional[Exception] = None
-        self._thread_task: Optional[asyncio.Task] = None
-        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stream_task: Optional[asyncio.Task] = None
 
     async def __aenter__(self) -> "GoogleRealtimeProvider":
-        self._loop = asyncio.get_running_loop()
-        self._thread_task = asyncio.create_task(self._run_stream_in_thread())
+        self._stream_task = asyncio.create_task(self._stream_loop())
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
         try:
             await self.end_audio()
-            if self._thread_task:
-                await self._thread_task
+            if self._stream_task:
+                await self._stream_task
         finally:
-            self._thread_task = None
+            self._stream_task = None
 
-    async def send_audio(self, pcm_chunk: bytes) -> None:
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None:
         """Send audio chunk to Google Speech-to-Text."""
         if self._error:
             raise self._error
@@ -80,34 +89,21 @@ class GoogleRealtimeProvider(RealtimeSttProvider):
 
     async def end_audio(self) -> None:
         """Signal end of audio stream."""
+        if self._closed.is_set():
+            return  # the stream is gone: nothing reads the audio queue any more
         await self._audio_q.put(None)
 
-    def events(self) -> AsyncIterator[TranscriptEvent | None]:
-        """Async iterator yielding transcript events."""
-        async def _aiter() -> AsyncIterator[TranscriptEvent]:
-            while True:
-                ev = await self._events_q.get()
-                if ev is None:
-                    if self._error:
-                        raise self._error
-                    break
-                yield ev
-        return _aiter()
+    def events(self) -> AsyncIterator[TranscriptEvent]:
+        """Async iterator yielding committed transcript events; raises the stored error on failure."""
+        return QueuedEventIterator(self._events_q, lambda: self._error)
 
     @property
     def error(self) -> Optional[Exception]:
         """Return the error that caused the connection to close, if any."""
         return self._error
 
-    async def _run_stream_in_thread(self) -> None:
-        await asyncio.to_thread(self._blocking_stream_loop)
-
-    def _blocking_stream_loop(self) -> None:
-        loop = self._loop
-        if loop is None:
-            raise RuntimeError("GoogleRealtimeProvider: event loop not set")
-
-        client = speech.SpeechClient()
+    async def _stream_loop(self) -> None:
+        client = speech.SpeechAsyncClient()
 
         # IntelliJ sometimes warns these constructors want dict; that's just stub noise.
         config = speech.RecognitionConfig(
@@ -120,44 +116,54 @@ class GoogleRealtimeProvider(RealtimeSttProvider):
             interim_results=self._cfg.interim_results,  # type: ignore[arg-type]
         )
 
-        def request_iter():
+        async def request_iter() -> AsyncIterator[speech.StreamingRecognizeRequest]:
+            # The async client has no (config, requests) helper: the first request carries
+            # the streaming config, every following one only audio.
+            yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)  # type: ignore[arg-type]
+            # Bound once: the loop runs for every audio chunk.
+            get = self._audio_q.get
+            new_request = _StreamingRecognizeRequestPb
+            wrap = speech.StreamingRecognizeRequest.wrap
             while True:
-                chunk = asyncio.run_coroutine_threadsafe(self._audio_q.get(), loop).result()
+                chunk = await get()
                 if chunk is None:
                     break
-                yield speech.StreamingRecognizeRequest(audio_content=chunk)  # type: ignore[arg-type]
+                # Protobuf bytes fields take bytes only, but a PcmChunk may be a memoryview.
+                # bytes() of a bytes object returns it as is, so this only copies views.
+                yield wrap(new_request(audio_content=bytes(chunk)))
 
         try:
             # This is iterator that feeds responses
-            responses = client.streaming_recognize(streaming_config, request_iter())  # type: ignore[arg-type]
+            responses = await client.streaming_recognize(requests=request_iter())
 
-            for resp in responses:
+            async for resp in responses:
                 # Note: Google is very verbose sending partial response after every
                 # submitted chunk. So we do not display them by default as it creates a LOT of debug.
                 # logger.debug("[STT] Google response:\n%r", resp)
 
-                # resp.results is a repeated field; iterate it.
-                for result in getattr(resp, "results", ()):
-                    if not result.alternatives:
+                # resp.results is a repeated field; iterate it. Proto fields are always present
+                # (unset ones read as empty/False), so plain attribute access is safe.
+                for result in resp.results:
+                    # Treat is_final as "committed"; interim results need no further look.
+                    if not result.is_final:
                         continue
-
-                    text = (result.alternatives[0].transcript or "").strip()
-                    if not text:
+                    alternatives = result.alternatives
+                    if not alternatives:
                         continue
 
-                    # Treat is_final as "committed"
-                    if bool(getattr(result, "is_final", False)):
+                    text = alternatives[0].transcript.strip()
+                    if text:
                         logger.debug("[STT] Google: final transcript received.")
-                        asyncio.run_coroutine_threadsafe(
-                            self._events_q.put(TranscriptEvent(text=text, is_final=True)),
-                            loop,
-                        ).result()
+                        self._events_q.put_nowait(TranscriptEvent(text=text, is_final=True))
 
         except Exception as e:
             logger.exception("[STT] Google streaming crashed: %r", e)
-            traceback.print_exc()
             self._error = e
         finally:
             # Stop the async iterator and mark closed.
-            asyncio.run_coroutine_threadsafe(self._events_q.put(None), loop).result()
+            self._events_q.put_nowait(None)
             self._closed.set()
+            # Nothing reads the audio queue any more: emptying it releases a send_audio()
+            # blocked on the full queue.
+            while not self._audio_q.empty():
+                self._audio_q.get_nowait()
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from dataclasses import dataclass
-from logging import getLogger
-from typing import AsyncIterator, Optional
+from logging import getLogger, DEBUG
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 from websockets import connect, ConnectionClosed, ConnectionClosedOK
 
@@ -13,10 +12,31 @@ from config import (
     STT_LANGUAGE_ISO_639_1,
     STT_VAD_SILENCE_THRESHOLD_S,
 )
-from lib.stt_provider import RealtimeSttProvider, TranscriptEvent
+from lib.fast_json import dumps, loads
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt_provider import (
+    AudioChunkBatcher,
+    PcmChunk,
+    QueuedEventIterator,
+    RealtimeSttProvider,
+    TranscriptEvent,
+)
 
 logger = getLogger(__name__)
 
+# EndOfStream only varies by last_seq_no: a bytes template, sent as a text frame (text=True).
+STT_MSG_END_OF_STREAM = b'{"message":"EndOfStream","last_seq_no":%d}'
+
+
+def _extract_transcript(data: dict) -> str:
+    """Return the segment text of an AddTranscript message (metadata.transcript), "" if missing."""
+    # Direct indexing: AddTranscript always carries metadata.transcript, so the success path
+    # skips the fallback objects of a .get(..., {}).get(...) chain.
+    try:
+        return data["metadata"]["transcript"]
+    except (KeyError, TypeError):
+        return ""
+
 
 @dataclass(frozen=True)
 class SpeechmaticsSttConfig:
@@ -40,6 +60,9 @@ class SpeechmaticsSttConfig:
     encoding: str = "pcm_s16le"
     sample_rate: int = AUDIO_SAMPLE_RATE
 
+    # Merge every n audio chunks into one AddAudio frame (see AudioChunkBatcher). 1 = off.
+    send_batch_chunks: int = 1
+
 
 class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
     """
@@ -54,7 +77,11 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
     def __init__(self, cfg: SpeechmaticsSttConfig) -> None:
         self._cfg = cfg
         self._ws = None
-        self._events_q: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue(maxsize=200)
+        self._send_frame: Optional[Callable[[bytes], Awaitable[None]]] = None  # self._ws.send, bound once
+        # Unbounded: put_nowait() never blocks, so a stalled consumer cannot stall WebSocket
+        # reads (and with them the server's finalization), and no committed segment is dropped.
+        # Audio is bounded upstream; final transcripts are small.
+        self._events_q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
 
         self._rx_task: Optional[asyncio.Task] = None
         self._closed = asyncio.Event()
@@ -62,39 +89,12 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
 
         self._error: Optional[Exception] = None
         self._seq_no: int = 0  # increments per AddAudio frame sent
+        self._batcher = AudioChunkBatcher(cfg.send_batch_chunks) if cfg.send_batch_chunks > 1 else None
 
-    async def __aenter__(self) -> "SpeechmaticsRealtimeProvider":
-        if not self._cfg.api_key:
-            raise ValueError("Speechmatics API key is required")
-
-        headers = {"Authorization": f"Bearer {self._cfg.api_key}"}
-        logger.info("[STT] Speechmatics: connecting to %s", self._cfg.base_url)
-        logger.debug("[STT] Speechmatics: using language=%s, encoding=%s, sample_rate=%d",
-                     self._cfg.language, self._cfg.encoding, self._cfg.sample_rate)
-
-        try:
-            self._ws = await asyncio.wait_for(
-                connect(
-                    self._cfg.base_url,
-                    additional_headers=headers,
-                    ping_interval=10,
-                    ping_timeout=10,
-                    close_timeout=5,
-                    max_queue=32,
-                ),
-                timeout=30.0,
-            )
-            logger.info("[STT] Speechmatics: WebSocket connected successfully")
-        except asyncio.TimeoutError:
-            raise RuntimeError("Speechmatics WebSocket connection timed out after 30s") from None
-
-        logger.debug("[STT] Speechmatics: starting receiver task...")
-        self._rx_task = asyncio.create_task(self._recv_loop())
-
-        # StartRecognition
+        # StartRecognition depends only on the (frozen) config: serialized once here.
         # max_delay (Number): Optional. Allowed between 0.7 and 4 seconds. Default is 4 seconds.
         # This is the delay in seconds between the end of a spoken word and returning the Final transcript results.
-        max_delay = float(self._cfg.max_delay_s)
+        max_delay = float(cfg.max_delay_s)
         if max_delay < 0.7:
             max_delay = 0.7
         if max_delay > 4.0:
@@ -106,12 +106,12 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
             "message": "StartRecognition",
             "audio_format": {
                 "type": "raw",
-                "encoding": self._cfg.encoding,
-                "sample_rate": int(self._cfg.sample_rate),
+                "encoding": cfg.encoding,
+                "sample_rate": int(cfg.sample_rate),
             },
             "transcription_config": {
-                "language": self._cfg.language,
-                "enable_partials": bool(self._cfg.enable_partials),
+                "language": cfg.language,
+                "enable_partials": bool(cfg.enable_partials),
                 "max_delay": max_delay,
                 "operating_point": "enhanced",
                 "enable_entities": True,
@@ -122,9 +122,48 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
                 },
             },
         }
+        # Kept as UTF-8 bytes and sent with text=True: a text frame without a str encode per send.
+        self._start_msg = dumps(start_msg).encode()
+        self._headers = {"Authorization": f"Bearer {cfg.api_key}"}
 
-        logger.debug("[STT] Speechmatics: sending StartRecognition: %s", json.dumps(start_msg))
-        await self._ws.send(json.dumps(start_msg))
+    async def __aenter__(self) -> "SpeechmaticsRealtimeProvider":
+        if not self._cfg.api_key:
+            raise ValueError("Speechmatics API key is required")
+
+        logger.info("[STT] Speechmatics: connecting to %s", self._cfg.base_url)
+        logger.debug("[STT] Speechmatics: using language=%s, encoding=%s, sample_rate=%d",
+                     self._cfg.language, self._cfg.encoding, self._cfg.sample_rate)
+
+        try:
+            self._ws = await asyncio.wait_for(
+                connect(
+                    self._cfg.base_url,
+                    additional_headers=self._headers,
+                    ping_interval=10,
+                    ping_timeout=10,
+                    close_timeout=5,
+                    # No read backpressure: _recv_loop() drains the socket continuously, so a
+                    # bounded queue would only pause reading (and pings) during bursts of partials.
+                    max_queue=None,
+                    # send() waits for the transport to drain above this many buffered bytes
+                    # (default 32 KiB). A larger high-water mark absorbs audio bursts, e.g. a
+                    # backlog flush or realtime_factor=0, without pausing the sender.
+                    write_limit=2**20,
+                ),
+                timeout=30.0,
+            )
+            self._send_frame = self._ws.send
+            logger.info("[STT] Speechmatics: WebSocket connected successfully")
+        except asyncio.TimeoutError:
+            raise RuntimeError("Speechmatics WebSocket connection timed out after 30s") from None
+
+        logger.debug("[STT] Speechmatics: starting receiver task...")
+        self._rx_task = asyncio.create_task(self._recv_loop())
+
+        # StartRecognition (pre-serialized in __init__)
+        if logger.isEnabledFor(DEBUG):
+            logger.debug("[STT] Speechmatics: sending StartRecognition: %s", self._start_msg.decode())
+        await self._ws.send(self._start_msg, text=True)
         logger.debug("[STT] Speechmatics: StartRecognition sent, waiting for RecognitionStarted...")
 
         try:
@@ -149,24 +188,27 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
                     pass
         finally:
             # Always terminate iterator
-            try:
-                await self._events_q.put(None)
-            except Exception:
-                pass
+            self._events_q.put_nowait(None)  # never blocks or raises
 
             self._ws = None
+            self._send_frame = None
             self._rx_task = None
 
-    async def send_audio(self, pcm_chunk: bytes) -> None:
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None:
         if self._error:
             raise self._error
         if self._closed.is_set() or self._ws is None:
             return
+        if self._batcher is not None:
+            pcm_chunk = self._batcher.add(pcm_chunk)
+            if pcm_chunk is None:
+                return
 
+        # last_seq_no counts AddAudio messages, so a batch is one sequence number.
         self._seq_no += 1
         try:
             # AddAudio is binary: just send bytes
-            await self._ws.send(pcm_chunk)
+            await self._send_frame(pcm_chunk)
         except ConnectionClosed:
             self._closed.set()
 
@@ -174,28 +216,23 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
         """
         EndOfStream: tell Speechmatics we won't send more audio.
         last_seq_no is required and should be the last AddAudio sequence number.
+        Audio still held back by send_batch_chunks is sent first.
         """
         if self._ws is None:
             return
 
         try:
-            eos = {"message": "EndOfStream", "last_seq_no": int(self._seq_no)}
-            await self._ws.send(json.dumps(eos))
+            if self._batcher is not None and (pcm := self._batcher.flush()) is not None:
+                self._seq_no += 1
+                await self._ws.send(pcm)
+            await self._ws.send(STT_MSG_END_OF_STREAM % self._seq_no, text=True)
             logger.debug("[STT] Speechmatics: EndOfStream sent (last_seq_no=%d)", self._seq_no)
         except Exception:
             pass
 
     def events(self) -> AsyncIterator[TranscriptEvent]:
-        async def _aiter() -> AsyncIterator[TranscriptEvent]:
-            while True:
-                ev = await self._events_q.get()
-                if ev is None:
-                    if self._error:
-                        raise self._error
-                    break
-                yield ev
-
-        return _aiter()
+        """Async iterator yielding committed transcript events; raises the stored error on failure."""
+        return QueuedEventIterator(self._events_q, lambda: self._error)
 
     async def _recv_loop(self) -> None:
         """
@@ -203,17 +240,17 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
         """
         assert self._ws is not None
         logger.debug("[STT] Speechmatics: _recv_loop started, waiting for messages...")
+        debug = logger.isEnabledFor(DEBUG)
 
+        recv = self._ws.recv
         try:
             while not self._closed.is_set():
-                msg = await self._ws.recv()
-
-                # We only expect JSON text in recv loop (audio is client->server only).
-                if isinstance(msg, (bytes, bytearray)):
-                    logger.warning("[STT] Speechmatics: unexpected binary message from server")
-                    continue
+                # Only JSON text frames come from the server (audio is client->server only).
+                # decode=False hands over the raw UTF-8 payload: loads() takes bytes and
+                # validates the encoding itself, so the str decode is skipped.
+                msg = await recv(decode=False)
 
-                data = json.loads(msg)
+                data = loads(msg)
                 typ = (data.get("message") or "").strip()
                 # logger.debug("[STT] Speechmatics: message=%s, data=%s", typ, str(data)[:200])
 
@@ -222,14 +259,16 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
                     continue
 
                 if typ == "AddTranscript":
-                    logger.debug("[STT] Speechmatics: AddTranscript %r", data)
+                    if debug:
+                        logger.debug("[STT] Speechmatics: AddTranscript %r", data)
                     # TODO: clarify whether not to use the results rather than metadata...
-                    text = data.get('metadata', {}).get('transcript', '').strip()
+                    text = _extract_transcript(data).strip()
                     if text:
-                        await self._events_q.put(TranscriptEvent(text=text, is_final=True))
+                        self._events_q.put_nowait(TranscriptEvent(text=text, is_final=True))
 
                 if typ == "AddPartialTranscript":
-                    logger.debug("[STT] Speechmatics: AddPartialTranscript %r", str(data)[:300])
+                    if debug:
+                        logger.debug("[STT] Speechmatics: AddPartialTranscript %.300s", data)
                     continue
 
                 if typ == "EndOfTranscript":
@@ -272,4 +311,4 @@ class SpeechmaticsRealtimeProvider(RealtimeSttProvider):
         finally:
             self._closed.set()
             self._ready.set()
-            await self._events_q.put(None)
+            self._events_q.put_nowait(None)
@@ -1,31 +1,55 @@
 """
-Shared utilities — logging setup.
+Shared utilities — logging setup and event loop runner.
 
 Configures dual-output logging: console (all levels) and a timestamped file
 in log/. Project modules (lib.*) log at DEBUG; third-party libraries are
 filtered to INFO+ in the file handler to keep logs readable.
+
+run_async() is the entry point for scripts: it runs the main coroutine on
+uvloop when installed (optional speedup), otherwise on the default asyncio loop.
+Set STT_NO_UVLOOP=1 to force the default loop even when uvloop is installed.
+On Python 3.12+ tasks are started eagerly (asyncio.eager_task_factory).
 """
+import asyncio
 from datetime import datetime
+from os import getenv
 from logging import getLogger, basicConfig, DEBUG, INFO, FileHandler, Formatter, Filter
 from pathlib import Path
+from typing import Any, Coroutine, TypeVar
 
 from config import LOG_PATH
 
+try:
+    import uvloop
+except ImportError:  # optional dependency (not available on Windows)
+    uvloop = None
+
+T = TypeVar("T")
+
 # ---------------------------------------------------------------------------
 # Logging setup
 # ---------------------------------------------------------------------------
 
 
-# Prefixes for project modules (DEBUG level in file)
-PROJECT_PREFIXES = ("lib.", "__main__")
+# Top-level package names of project modules (DEBUG level in file)
+PROJECT_ROOTS = frozenset({"lib", "__main__"})
 LOG_FORMAT = "%(asctime)s %(levelname)s:%(name)s:%(funcName)s(): %(message)s"
 
 
 class _ThirdPartyLogFilter(Filter):
     """Filter that only passes records from 3rd party modules at INFO+."""
 
+    def __init__(self) -> None:
+        super().__init__()
+        # Logger name -> is a project module. Runs for every record; logger names are
+        # few and fixed, so the cache stays small.
+        self._is_project: dict[str, bool] = {}
+
     def filter(self, record):
-        is_project = record.name.startswith(PROJECT_PREFIXES)
+        is_project = self._is_project.get(record.name)
+        if is_project is None:
+            root = record.name.partition(".")[0]
+            is_project = self._is_project[record.name] = root in PROJECT_ROOTS
         if is_project:
             return True  # project code: pass all levels
         return record.levelno >= INFO  # 3rd party: INFO and above only
@@ -54,3 +78,38 @@ def setup_logging(level: int = DEBUG) -> Path:
 
     getLogger(__name__).info("Logging to file: %s", log_filename)
     return log_filename
+
+
+# ---------------------------------------------------------------------------
+# Event loop
+# ---------------------------------------------------------------------------
+
+
+def run_async(main: Coroutine[Any, Any, T]) -> T:
+    """
+    Run the main coroutine to completion, like asyncio.run().
+
+    Uses uvloop if installed — its C implementation of sockets and callback
+    scheduling makes every WebSocket send/recv and queue hand-off cheaper.
+    Falls back to the default asyncio event loop otherwise, or when the
+    STT_NO_UVLOOP environment variable is set to a non-empty value other
+    than "0" (e.g. to rule out the loop when debugging).
+    """
+    if uvloop is not None and getenv("STT_NO_UVLOOP", "0") in ("", "0"):
+        getLogger(__name__).info("Running on uvloop %s.", uvloop.__version__)
+        return uvloop.run(_with_eager_tasks(main))
+    return asyncio.run(_with_eager_tasks(main))
+
+
+async def _with_eager_tasks(main: Coroutine[Any, Any, T]) -> T:
+    """
+    Await main with the eager task factory installed (Python 3.12+, no-op before).
+
+    Eager tasks run synchronously up to their first real suspension point, so
+    the many short-lived create_task() calls (provider receive loops, session
+    sender/receiver) skip a round-trip through the scheduler.
+    """
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
+    return await main
@@ -0,0 +1,85 @@
+"""
+Tests for the single-producer/single-consumer queue used between pipeline stages.
+
+No STT providers or audio files needed.
+
+    pytest tests/test_spsc_queue.py -v
+"""
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from lib.spsc_queue import AsyncSpscQueue
+
+
+class TestAsyncSpscQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_fifo_order_and_sentinel(self) -> None:
+        """Items come out in insertion order; None passes through as a sentinel."""
+        q: AsyncSpscQueue[str | None] = AsyncSpscQueue()
+        for item in ("a", "b", None):
+            await q.put(item)
+        self.assertEqual(q.qsize(), 3)
+
+        self.assertEqual(await q.get(), "a")
+        self.assertEqual(await q.get(), "b")
+        self.assertIsNone(await q.get())
+        self.assertTrue(q.empty())
+
+    async def test_get_waits_for_producer(self) -> None:
+        """get() suspends on an empty queue and wakes up on the next put."""
+        q: AsyncSpscQueue[str] = AsyncSpscQueue()
+        getter = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        self.assertFalse(getter.done())
+
+        q.put_nowait("late")
+        self.assertEqual(await asyncio.wait_for(getter, timeout=1.0), "late")
+
+    async def test_cancelled_get_leaves_queue_usable(self) -> None:
+        """A cancelled waiting get() neither loses the next item nor breaks later waits."""
+        q: AsyncSpscQueue[str] = AsyncSpscQueue()
+        getter = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        getter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await getter
+
+        q.put_nowait("kept")
+        self.assertEqual(await q.get(), "kept")
+
+        getter = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        q.put_nowait("next")
+        self.assertEqual(await asyncio.wait_for(getter, timeout=1.0), "next")
+
+    async def test_bounded_put_waits_for_consumer(self) -> None:
+        """With maxsize, put() blocks on a full queue until a get makes room; put_nowait() raises."""
+        q: AsyncSpscQueue[str] = AsyncSpscQueue(maxsize=1)
+        await q.put("a")
+        self.assertTrue(q.full())
+        with self.assertRaises(asyncio.QueueFull):
+            q.put_nowait("b")
+
+        putter = asyncio.create_task(q.put("b"))
+        await asyncio.sleep(0)
+        self.assertFalse(putter.done())
+
+        self.assertEqual(await q.get(), "a")
+        await asyncio.wait_for(putter, timeout=1.0)
+        self.assertEqual(q.get_nowait(), "b")
+
+    async def test_get_nowait_on_empty_raises(self) -> None:
+        q: AsyncSpscQueue[str] = AsyncSpscQueue()
+        with self.assertRaises(asyncio.QueueEmpty):
+            q.get_nowait()
+
+    async def test_get_batch_drains_all(self) -> None:
+        q: AsyncSpscQueue[str | None] = AsyncSpscQueue()
+        getter = asyncio.create_task(q.get_batch())
+        await asyncio.sleep(0)
+        for item in ("a", "b", None):
+            q.put_nowait(item)
+        self.assertEqual(await asyncio.wait_for(getter, timeout=1.0), ["a", "b", None])
+        self.assertTrue(q.empty())
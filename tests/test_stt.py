@@ -7,24 +7,29 @@ within 14% of the expected ground truth. The goal is to verify that the
 provider connection and real-time pipeline work — not to measure accuracy
 (see benchmark.py for that).
 
-Tests run sequentially (one provider at a time). Run a single provider with::
+Tests run one provider at a time; within a test the asset files stream
+concurrently, each through its own provider session (at most
+STT_TEST_MAX_PARALLEL at once, default 4 — lower it if a provider rate-limits
+concurrent sessions). Run a single provider with::
 
     pytest tests/test_stt.py::TestStt::test_deepgram -v
 """
 from __future__ import annotations
 
+import asyncio
 import unittest
 from datetime import datetime
 from logging import getLogger
 from os import getenv
 from typing import Any, Awaitable, Callable, Optional, Type
 
-from helpers.diff_report import CustomMetricResult
+from helpers.diff_report import CustomMetricResult, DiffReport
 
 from dotenv import load_dotenv
 
 from config import AUDIO_SAMPLE_RATE, CHUNK_MS, TEST_REALTIME_FACTOR, FINAL_SILENCE_S, OUT_PATH, ASSETS_DIR
-from helpers.load_assets import get_test_files
+from helpers.load_assets import AssetPair, get_test_files
+from helpers.stream_wav import WavPcmCache
 from helpers.transcribe import transcribe_and_diff
 from lib.stt_provider_cartesia import CartesiaInkProvider, CartesiaSttConfig
 from lib.stt_provider_deepgram import DeepgramRealtimeProvider, DeepgramSttConfig
@@ -35,10 +40,33 @@ from lib.utils import setup_logging
 
 setup_logging()
 logger = getLogger(__name__)
-load_dotenv()
 
 
 class TestStt(unittest.IsolatedAsyncioTestCase):
+    _pairs: list[AssetPair]
+    _keys: dict[str, Optional[str]]
+    _max_parallel: int
+    _pcm_cache: WavPcmCache
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Scanned once for the whole class instead of once per provider test.
+        cls._pairs = list(get_test_files(ASSETS_DIR))
+        # Each asset is decoded once and reused by every provider test.
+        cls._pcm_cache = WavPcmCache()
+
+        # .env is parsed once, when the tests run (not at collection), and the keys resolved up front.
+        load_dotenv()
+        cls._keys = {
+            "cartesia": getenv("CARTESIA_API_KEY"),
+            "deepgram": getenv("DEEPGRAM_API_KEY"),
+            "elevenlabs": getenv("ELEVENLABS_API_KEY"),
+            "speechmatics": getenv("SPEECHMATICS_API_KEY"),
+            "gemini": getenv("GEMINI_API_KEY"),
+        }
+        # Upper bound on concurrent provider sessions per test (one per asset file).
+        cls._max_parallel = max(1, int(getenv("STT_TEST_MAX_PARALLEL", "4")))
+
     async def _runner(
             self,
             provider_cls: Type[Any],
@@ -48,9 +76,12 @@ class TestStt(unittest.IsolatedAsyncioTestCase):
         """
         Stream all asset files through a provider and assert output length.
 
-        For each WAV/TXT pair, instantiates the provider, runs the full
-        transcribe-and-diff pipeline, writes an HTML diff report to out/,
-        and checks that the transcript length is within 14% of expected.
+        Each WAV/TXT pair gets its own provider instance and runs the full
+        transcribe-and-diff pipeline concurrently with the others (bounded by
+        STT_TEST_MAX_PARALLEL), writing an HTML diff report to out/. Streaming is paced
+        in real time, so the test takes about as long as the longest file
+        rather than the sum of all of them. The results are then checked one
+        by one: the transcript length must be within 14% of expected.
 
         custom_metric_fn: optional async (expected, got) -> CustomMetricResult.
             When supplied, the result is embedded in the diff report and HTML.
@@ -60,16 +91,17 @@ class TestStt(unittest.IsolatedAsyncioTestCase):
         ts = datetime.now().strftime('%Y%m%d_%H%M%S')  # make sure all reports from run has same timestamp
         ts += "_" + provider_cls.__name__
 
-        pairs = list(get_test_files(ASSETS_DIR))
+        pairs = self._pairs
         if not pairs:
             assert False, f"Found no files to test. Requires at least one wav/txt pair in {ASSETS_DIR}."
 
-        for pair in pairs:
-            with self.subTest(msg=pair.wav.name):
-                logger.info("Processing file %s.", pair.wav.name)
+        semaphore = asyncio.Semaphore(self._max_parallel)
 
+        async def process_pair(pair: AssetPair) -> DiffReport:
+            async with semaphore:
+                logger.info("Processing file %s.", pair.wav.name)
                 provider = provider_cls(config)
-                report = await transcribe_and_diff(
+                return await transcribe_and_diff(
                     provider,
                     pair.wav,
                     pair.txt,
@@ -79,7 +111,17 @@ class TestStt(unittest.IsolatedAsyncioTestCase):
                     realtime_factor=TEST_REALTIME_FACTOR,
                     silence_s=FINAL_SILENCE_S,
                     custom_metric_fn=custom_metric_fn,
+                    pcm_cache=self._pcm_cache,
                 )
+
+        # return_exceptions: one failing file must not cancel the others; it fails its own subTest below.
+        results = await asyncio.gather(*(process_pair(pair) for pair in pairs), return_exceptions=True)
+
+        for pair, report in zip(pairs, results):
+            with self.subTest(msg=pair.wav.name):
+                if isinstance(report, BaseException):
+                    raise report
+
                 logger.info(f"{pair.wav.name} WER: {report.word_error_rate:.1f}%, CER: {report.character_error_rate:.1f}%")
                 if report.custom_metric is not None:
                     logger.info(f"{pair.wav.name} LLM understanding: {report.custom_metric.score:.1f}%")
@@ -90,15 +132,15 @@ class TestStt(unittest.IsolatedAsyncioTestCase):
                 self.assertAlmostEqual(len(report.text_expected), len(report.text_got), delta=len(report.text_expected) / 7.0)
 
     async def test_cartesia(self) -> None:
-        config = CartesiaSttConfig(api_key=getenv("CARTESIA_API_KEY"))
+        config = CartesiaSttConfig(api_key=self._keys["cartesia"])
         await self._runner(CartesiaInkProvider, config)
 
     async def test_deepgram(self) -> None:
-        config = DeepgramSttConfig(api_key=getenv("DEEPGRAM_API_KEY"))
+        config = DeepgramSttConfig(api_key=self._keys["deepgram"])
         await self._runner(DeepgramRealtimeProvider, config)
 
     async def test_eleven_labs(self) -> None:
-        config = ElevenLabsSttConfig(api_key=getenv("ELEVENLABS_API_KEY"))
+        config = ElevenLabsSttConfig(api_key=self._keys["elevenlabs"])
         await self._runner(ElevenLabsRealtimeProvider, config)
 
     async def test_google(self) -> None:
@@ -108,7 +150,7 @@ class TestStt(unittest.IsolatedAsyncioTestCase):
         await self._runner(GoogleRealtimeProvider, config)
 
     async def test_speechmatics(self) -> None:
-        config = SpeechmaticsSttConfig(api_key=getenv("SPEECHMATICS_API_KEY"))
+        config = SpeechmaticsSttConfig(api_key=self._keys["speechmatics"])
         await self._runner(SpeechmaticsRealtimeProvider, config)
 
     async def test_speechmatics_semantics(self) -> None:
@@ -122,10 +164,10 @@ class TestStt(unittest.IsolatedAsyncioTestCase):
         except ImportError as exc:
             self.fail(f"google-genai not installed — run: pip install google-genai\n{exc}")
         else:
-            api_key = getenv("GEMINI_API_KEY")
+            api_key = self._keys["gemini"]
             if not api_key:
                 self.fail("GEMINI_API_KEY not set — add it to .env to run this test")
             else:
                 analyzer = SemanticUnderstandingAnalyzer(api_key)
-                config = SpeechmaticsSttConfig(api_key=getenv("SPEECHMATICS_API_KEY"))
+                config = SpeechmaticsSttConfig(api_key=self._keys["speechmatics"])
                 await self._runner(SpeechmaticsRealtimeProvider, config, custom_metric_fn=analyzer.compare)
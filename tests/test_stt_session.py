@@ -0,0 +1,253 @@
+"""
+Tests for the provider-agnostic session plumbing in lib/stt.py.
+
+Uses an in-memory fake provider — no network, API keys or audio files needed.
+
+    pytest tests/test_stt_session.py -v
+"""
+from __future__ import annotations
+
+import asyncio
+import unittest
+from typing import AsyncIterator, Optional
+
+from lib.spsc_queue import AsyncSpscQueue
+from lib.stt import _respawn_delay, stop_stt_session, stt_session_task, stt_session_with_respawn
+from lib.stt_provider import AudioChunkBatcher, PcmChunk, QueuedEventIterator, TranscriptEvent
+
+
+class FakeProvider:
+    """Commits every audio chunk as a transcript; optionally drops the connection after N chunks or at end_audio()."""
+
+    def __init__(self, drop_after: Optional[int] = None, drop_on_end: bool = False) -> None:
+        self._drop_after = drop_after
+        self._drop_on_end = drop_on_end
+        self._events: asyncio.Queue[TranscriptEvent | Exception | None] = asyncio.Queue()
+        self.sent = 0
+
+    async def __aenter__(self) -> "FakeProvider":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    async def send_audio(self, pcm_chunk: PcmChunk) -> None:
+        await asyncio.sleep(0)  # yield like a real network send
+        self.sent += 1
+        await self._events.put(TranscriptEvent(text=f" {bytes(pcm_chunk).decode()} ", is_final=True))
+        if self.sent == self._drop_after:
+            await self._events.put(ConnectionError("dropped"))
+
+    async def end_audio(self) -> None:
+        await self._events.put(ConnectionError("dropped") if self._drop_on_end else None)
+
+    async def events(self) -> AsyncIterator[TranscriptEvent]:
+        while True:
+            ev = await self._events.get()
+            if ev is None:
+                return
+            if isinstance(ev, Exception):
+                raise ev
+            yield ev
+
+
+async def _drain(transcript_queue: AsyncSpscQueue[Optional[str]]) -> list[str]:
+    out = []
+    while (item := transcript_queue.get_nowait()) is not None:
+        out.append(item)
+    return out
+
+
+class TestSttSession(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.audio_queue: asyncio.Queue[Optional[PcmChunk]] = asyncio.Queue()
+        self.transcript_queue: AsyncSpscQueue[Optional[str]] = AsyncSpscQueue()
+        self.running = asyncio.Event()
+        self.running.set()
+
+    async def test_clean_close(self) -> None:
+        """All audio is transcribed, then None closes the transcript queue."""
+        for chunk in (b"a", b"b", None):
+            self.audio_queue.put_nowait(chunk)
+        await stt_session_task(FakeProvider(), self.audio_queue, self.transcript_queue, self.running)
+        self.assertEqual(await _drain(self.transcript_queue), ["a", "b"])
+
+    async def test_backlog_is_coalesced(self) -> None:
+        """With max_batch_bytes, chunks already waiting in the queue go out as one send."""
+        for chunk in (b"a", b"b", b"c", None):
+            self.audio_queue.put_nowait(chunk)
+        provider = FakeProvider()
+        await stt_session_task(provider, self.audio_queue, self.transcript_queue, self.running, max_batch_bytes=2)
+        self.assertEqual(provider.sent, 2)
+        self.assertEqual(await _drain(self.transcript_queue), ["ab", "c"])
+
+    async def test_stop_wakes_idle_sender(self) -> None:
+        """stop_stt_session() ends the audio even while the sender waits on an empty queue."""
+        provider = FakeProvider()
+        session = asyncio.create_task(
+            stt_session_task(provider, self.audio_queue, self.transcript_queue, self.running),
+        )
+        self.audio_queue.put_nowait(b"a")
+        await asyncio.sleep(0.01)  # "a" is sent; the sender now blocks on the empty queue
+        stop_stt_session(self.running, self.audio_queue)
+        await asyncio.wait_for(session, timeout=1.0)
+        self.assertEqual(provider.sent, 1)
+
+    def test_stop_on_full_queue_keeps_sentinel(self) -> None:
+        audio_queue: asyncio.Queue[Optional[PcmChunk]] = asyncio.Queue(maxsize=2)
+        for chunk in (b"a", b"b"):
+            audio_queue.put_nowait(chunk)
+        stop_stt_session(self.running, audio_queue)
+        self.assertFalse(self.running.is_set())
+        self.assertEqual([audio_queue.get_nowait(), audio_queue.get_nowait()], [b"b", None])
+
+    async def test_early_close_raises_provider_error(self) -> None:
+        """A dropped connection surfaces the provider's own exception and leaves the queue open."""
+        for chunk in (b"a", b"b", b"c", None):
+            self.audio_queue.put_nowait(chunk)
+        with self.assertRaises(ConnectionError):
+            await stt_session_task(FakeProvider(drop_after=1), self.audio_queue, self.transcript_queue, self.running)
+        self.assertEqual(self.transcript_queue.get_nowait(), "a")
+        self.assertTrue(self.transcript_queue.empty())
+
+    async def test_respawn_continues_on_same_queues(self) -> None:
+        """After a drop, a fresh provider takes over the same queues and the session closes cleanly."""
+        providers: list[FakeProvider] = []
+
+        def factory() -> FakeProvider:
+            providers.append(FakeProvider(drop_after=1 if not providers else None))
+            return providers[-1]
+
+        self.audio_queue.put_nowait(b"a")
+
+        async def produce_after_drop() -> None:
+            while len(providers) < 2:
+                await asyncio.sleep(0.005)
+            for chunk in (b"b", None):
+                self.audio_queue.put_nowait(chunk)
+
+        producer = asyncio.create_task(produce_after_drop())
+        await stt_session_with_respawn(
+            factory, self.audio_queue, self.transcript_queue, self.running, retry_delay=0.01,
+        )
+        await producer
+        self.assertEqual(await _drain(self.transcript_queue), ["a", "b"])
+        self.assertEqual(providers[1].sent, 1)
+
+    async def test_no_respawn_after_end_of_audio(self) -> None:
+        """A drop after the sentinel was consumed re-raises instead of waiting for audio that never comes."""
+        providers: list[FakeProvider] = []
+
+        def factory() -> FakeProvider:
+            providers.append(FakeProvider(drop_on_end=True))
+            return providers[-1]
+
+        for chunk in (b"a", None):
+            self.audio_queue.put_nowait(chunk)
+        with self.assertRaises(ConnectionError):
+            await asyncio.wait_for(
+                stt_session_with_respawn(factory, self.audio_queue, self.transcript_queue, self.running),
+                timeout=1.0,
+            )
+        self.assertEqual(len(providers), 1)
+
+    async def test_respawn_gives_up_after_max_retries(self) -> None:
+        self.audio_queue.put_nowait(b"a")
+        with self.assertRaises(ConnectionError):
+            await stt_session_with_respawn(
+                lambda: FakeProvider(drop_after=1), self.audio_queue, self.transcript_queue, self.running,
+                max_retries=0,
+            )
+
+    async def test_healthy_session_resets_retry_count(self) -> None:
+        """Failures of sessions that ran long enough never exhaust max_retries."""
+        attempts = 0
+
+        def factory() -> FakeProvider:
+            nonlocal attempts
+            attempts += 1
+            # Fail three times in a row, then close cleanly.
+            self.audio_queue.put_nowait(b"x" if attempts <= 3 else None)
+            return FakeProvider(drop_after=1)
+
+        await stt_session_with_respawn(
+            factory, self.audio_queue, self.transcript_queue, self.running,
+            max_retries=1, retry_delay=0.001, healthy_session_s=0.0,
+        )
+        self.assertEqual(attempts, 4)
+
+    async def test_healthy_session_after_end_of_audio_is_not_respawned(self) -> None:
+        """The retry-count reset does not bypass the end-of-audio check."""
+        providers: list[FakeProvider] = []
+
+        def factory() -> FakeProvider:
+            providers.append(FakeProvider(drop_on_end=True))
+            return providers[-1]
+
+        for chunk in (b"a", None):
+            self.audio_queue.put_nowait(chunk)
+        with self.assertRaises(ConnectionError):
+            await asyncio.wait_for(
+                stt_session_with_respawn(
+                    factory, self.audio_queue, self.transcript_queue, self.running, healthy_session_s=0.0,
+                ),
+                timeout=1.0,
+            )
+        self.assertEqual(len(providers), 1)
+
+    async def test_stop_during_backoff_is_not_respawned(self) -> None:
+        """Clearing conversation_running while waiting to respawn re-raises instead of reconnecting."""
+        providers: list[FakeProvider] = []
+
+        def factory() -> FakeProvider:
+            providers.append(FakeProvider(drop_after=1))
+            return providers[-1]
+
+        async def stop_soon() -> None:
+            await asyncio.sleep(0.02)
+            self.running.clear()
+
+        self.audio_queue.put_nowait(b"a")
+        stopper = asyncio.create_task(stop_soon())
+        with self.assertRaises(ConnectionError):
+            await asyncio.wait_for(
+                stt_session_with_respawn(
+                    factory, self.audio_queue, self.transcript_queue, self.running, retry_delay=0.2,
+                ),
+                timeout=1.0,
+            )
+        await stopper
+        self.assertEqual(len(providers), 1)
+
+    def test_respawn_delay_grows_with_jitter_and_cap(self) -> None:
+        for failed_retries, upper in ((1, 1.0), (2, 2.0), (3, 4.0), (10, 30.0), (5000, 30.0)):
+            delay = _respawn_delay(failed_retries, retry_delay=1.0, max_delay=30.0)
+            self.assertGreaterEqual(delay, upper / 2)
+            self.assertLessEqual(delay, upper)
+
+
+class TestQueuedEventIterator(unittest.IsolatedAsyncioTestCase):
+
+    async def test_ends_on_sentinel(self) -> None:
+        q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
+        ev = TranscriptEvent(text="a", is_final=True)
+        for item in (ev, None):
+            q.put_nowait(item)
+        self.assertEqual([e async for e in QueuedEventIterator(q, lambda: None)], [ev])
+
+    async def test_raises_stored_error(self) -> None:
+        q: AsyncSpscQueue[Optional[TranscriptEvent]] = AsyncSpscQueue()
+        q.put_nowait(None)
+        with self.assertRaises(RuntimeError):
+            async for _ in QueuedEventIterator(q, lambda: RuntimeError("closed")):
+                pass
+
+
+class TestAudioChunkBatcher(unittest.TestCase):
+
+    def test_merges_every_n_chunks_and_flushes_rest(self) -> None:
+        batcher = AudioChunkBatcher(2)
+        self.assertEqual([batcher.add(c) for c in (b"a", b"b", b"c")], [None, b"ab", None])
+        self.assertEqual(batcher.flush(), b"c")
+        self.assertIsNone(batcher.flush())